@@ -0,0 +1,317 @@
+"""
+Benchmark harness for the sales pipeline.
+
+Generates sales.csv-shaped synthetic data (with dirty rows) at several sizes, times every
+stage of the pipeline and records peak memory, then writes the results to JSON so runs can
+be compared between commits:
+
+    python benchmark.py --sizes 10k 1m
+    python benchmark.py --sizes 100m --mode stream
+
+Peak RSS is always recorded per size. --trace-memory adds per-stage tracemalloc peaks, but
+tracing slows object-heavy stages (string cleaning, date parsing) several times over, so
+compare timings only between runs with the same setting.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from charts import render_all
+from sales_pipeline import (
+    CSV_ENCODING,
+    SALES_SCHEMA,
+    SalesAggregates,
+    add_features,
+    build_insights,
+    clean_sales,
+    read_sales,
+    stream_sales,
+)
+
+try:
+    import resource
+except ImportError:  # Windows: only tracemalloc peaks are reported
+    resource = None
+
+BENCH_DIR = os.path.join(os.path.dirname(__file__), "benchmarks")
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000, "100m": 100_000_000}
+GENERATE_CHUNK_ROWS = 1_000_000
+
+# Product lines and their share of rows, roughly as in data/sales.csv
+PRODUCT_LINES = {
+    "Classic Cars": 0.34,
+    "Vintage Cars": 0.21,
+    "Motorcycles": 0.12,
+    "Planes": 0.11,
+    "Trucks and Buses": 0.11,
+    "Ships": 0.08,
+    "Trains": 0.03,
+}
+STATUSES = {"Shipped": 0.93, "Cancelled": 0.02, "Resolved": 0.02, "On Hold": 0.015, "In Process": 0.01, "Disputed": 0.005}
+COUNTRIES = {"USA": "NA", "France": "EMEA", "Spain": "EMEA", "Australia": "APAC", "UK": "EMEA", "Italy": "EMEA", "Japan": "Japan", "Canada": "NA"}
+PRODUCTS_PER_LINE = 16
+CUSTOMERS = 100
+DATE_SPAN_DAYS = 3 * 365
+
+
+def _customer_pool(rng):
+    countries = np.array(list(COUNTRIES))
+    country = countries[rng.integers(0, len(countries), CUSTOMERS)]
+    ids = np.arange(CUSTOMERS)
+    return pd.DataFrame(
+        {
+            "CUSTOMERNAME": [f"Customer {i} Inc." for i in ids],
+            "PHONE": [f"555{i:07d}" for i in ids],
+            "ADDRESSLINE1": [f"{100 + i} Long Airport Avenue" for i in ids],
+            "ADDRESSLINE2": [f"Level {i % 5}" if i % 7 == 0 else None for i in ids],
+            "CITY": [f"City {i % 40}" for i in ids],
+            "STATE": [f"S{i % 12}" if c in ("USA", "Australia", "Canada") else None for i, c in zip(ids, country)],
+            "POSTALCODE": [f"{10000 + i * 37}" for i in ids],
+            "COUNTRY": country,
+            "TERRITORY": [COUNTRIES[c] for c in country],
+            "CONTACTLASTNAME": [f"Last{i}" for i in ids],
+            "CONTACTFIRSTNAME": [f"First{i}" for i in ids],
+        }
+    )
+
+
+def generate_sales(n_rows, seed=0, dirty_fraction=0.005, start_order=10100):
+    """
+    One block of synthetic sales rows with the 25 columns of sales.csv
+    """
+    rng = np.random.default_rng(seed)
+    customers = _customer_pool(np.random.default_rng(0))
+
+    lines = np.array(list(PRODUCT_LINES))
+    line_idx = rng.choice(len(lines), n_rows, p=list(PRODUCT_LINES.values()))
+    product_idx = rng.integers(0, PRODUCTS_PER_LINE, n_rows)
+    msrp = 50 + (line_idx * 13 + product_idx * 7) % 160
+    quantity = rng.integers(6, 98, n_rows)
+    price = np.round(np.minimum(msrp * rng.uniform(0.75, 1.25, n_rows), 100.0), 2)
+    sales = np.round(quantity * price * rng.uniform(0.9, 1.6, n_rows), 2)
+
+    dates = pd.Timestamp("2003-01-01") + pd.to_timedelta(rng.integers(0, DATE_SPAN_DAYS, n_rows), unit="D")
+    # Formatting each distinct day once is much cheaper than strftime per row
+    day_codes, days = pd.factorize(dates)
+    day_labels = np.array([f"{d.month}/{d.day}/{d.year} 0:00" for d in days])
+
+    customer_idx = rng.integers(0, CUSTOMERS, n_rows)
+    statuses = np.array(list(STATUSES))
+    df = pd.DataFrame(
+        {
+            "ORDERNUMBER": start_order + np.arange(n_rows) // 9,
+            "QUANTITYORDERED": quantity,
+            "PRICEEACH": price,
+            "ORDERLINENUMBER": np.arange(n_rows) % 9 + 1,
+            "SALES": sales,
+            "ORDERDATE": day_labels[day_codes],
+            "STATUS": statuses[rng.choice(len(statuses), n_rows, p=list(STATUSES.values()))],
+            "QTR_ID": (dates.month - 1) // 3 + 1,
+            "MONTH_ID": dates.month,
+            "YEAR_ID": dates.year,
+            "PRODUCTLINE": lines[line_idx],
+            "MSRP": msrp,
+            "PRODUCTCODE": [f"S{l + 10}_{p:04d}" for l, p in zip(line_idx, product_idx)],
+        }
+    )
+    df = pd.concat([df, customers.iloc[customer_idx].reset_index(drop=True)], axis=1)
+    df["DEALSIZE"] = np.where(sales < 3000, "Small", np.where(sales < 7000, "Medium", "Large"))
+
+    # Dirty rows: messy labels, missing product lines, unparseable sales and dates
+    messy = rng.random(n_rows) < 0.02
+    df.loc[messy, "PRODUCTLINE"] = " " + df.loc[messy, "PRODUCTLINE"].str.lower() + " "
+    dirty = np.flatnonzero(rng.random(n_rows) < dirty_fraction)
+    kinds = rng.integers(0, 3, len(dirty))
+    df["SALES"] = df["SALES"].astype(object)
+    df.loc[dirty[kinds == 0], "PRODUCTLINE"] = None
+    df.loc[dirty[kinds == 1], "SALES"] = "#VALUE!"
+    df.loc[dirty[kinds == 2], "ORDERDATE"] = "00/00/0000"
+    return df[list(SALES_SCHEMA["columns"])]
+
+
+def write_sales_csv(path, n_rows, seed=0, chunk_rows=GENERATE_CHUNK_ROWS):
+    """
+    Write `n_rows` synthetic rows to `path` in blocks, so 100M rows never sit in memory
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    written = 0
+    block = 0
+    while written < n_rows:
+        rows = min(chunk_rows, n_rows - written)
+        df = generate_sales(rows, seed=seed + block, start_order=10100 + written // 9)
+        df.to_csv(tmp_path, mode="w" if block == 0 else "a", header=block == 0, index=False, encoding=CSV_ENCODING)
+        written += rows
+        block += 1
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset_path(n_rows, data_dir):
+    path = os.path.join(data_dir, f"sales_{n_rows}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {n_rows:,} rows -> {path}")
+        write_sales_csv(path, n_rows)
+    return path
+
+
+class StageTimer:
+    """
+    Records wall time, and the tracemalloc peak if tracing is on, for each named stage
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        result = {"seconds": round(time.perf_counter() - start, 4)}
+        if tracing:
+            result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        self.stages[name] = result
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / 2**20 if sys.platform == "darwin" else peak / 2**10, 2)
+
+
+def run_benchmark(path, mode="memory", engine="c", chunksize=None, charts=True, trace_memory=False):
+    """
+    Run the pipeline stages on `path` and return their timings. Runs inside a fresh worker
+    process (see main) so peak RSS belongs to this size alone.
+    """
+    timer = StageTimer()
+    stats = Counter()
+    if trace_memory:
+        tracemalloc.start()
+
+    if mode == "stream":
+        with timer.stage("load+clean+features+analysis"):
+            aggregates = stream_sales(path, chunksize=chunksize or 1_000_000, stats=stats)
+    else:
+        with timer.stage("load"):
+            df = read_sales(path, columns=SALES_SCHEMA["required"], engine=engine)
+        with timer.stage("clean"):
+            df = clean_sales(df, stats)
+        with timer.stage("features"):
+            df = add_features(df)
+        with timer.stage("analysis"):
+            aggregates = SalesAggregates.from_frame(df)
+        del df
+
+    category_sales = aggregates.category_totals()
+    monthly_sales = aggregates.monthly_totals()
+    with timer.stage("insights"):
+        build_insights(category_sales, monthly_sales, aggregates.total, aggregates.mean)
+    if charts:
+        with timer.stage("charts"), tempfile.TemporaryDirectory() as chart_dir:
+            render_all(category_sales, monthly_sales, chart_dir)
+
+    tracemalloc.stop()
+    return {
+        "stages": timer.stages,
+        "total_seconds": round(sum(s["seconds"] for s in timer.stages.values()), 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "rows_read": stats["rows_read"],
+        "rows_dropped": stats["rows_read"] - aggregates.count,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the sales pipeline on synthetic data")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["10k", "1m"], help="Dataset sizes to run")
+    parser.add_argument(
+        "--mode",
+        choices=["memory", "stream"],
+        default="memory",
+        help="memory: load the whole file like main.py; stream: chunked aggregates (use for 100m)",
+    )
+    parser.add_argument("--engine", choices=["c", "pyarrow"], default="c", help="CSV parser engine")
+    parser.add_argument("--chunksize", type=int, default=None, help="Rows per chunk in stream mode")
+    parser.add_argument("--no-charts", action="store_true", help="Skip the chart rendering stage")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record per-stage tracemalloc peaks (slows down Python-level work)",
+    )
+    parser.add_argument("--data-dir", default=os.path.join(BENCH_DIR, "data"), help="Where generated CSVs are kept")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results-<commit>.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "mode": args.mode,
+        "engine": args.engine,
+        "trace_memory": args.trace_memory,
+        "results": [],
+    }
+
+    for size in args.sizes:
+        n_rows = SIZES[size]
+        path = dataset_path(n_rows, args.data_dir)
+        # A fresh process per size keeps the peak RSS numbers independent
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(
+                run_benchmark, path, args.mode, args.engine, args.chunksize, not args.no_charts, args.trace_memory
+            ).result()
+        result = {"size": size, "rows": n_rows, **result}
+        report["results"].append(result)
+
+        print(f"\n{size} rows ({args.mode}):")
+        for name, stage in result["stages"].items():
+            peak = f"{stage['peak_mb']:>10.1f} MB" if "peak_mb" in stage else ""
+            print(f"  {name:<32} {stage['seconds']:>9.3f}s  {peak}")
+        print(f"  {'total':<32} {result['total_seconds']:>9.3f}s  peak RSS {result['peak_rss_mb']} MB")
+
+    output = args.output or os.path.join(BENCH_DIR, f"results-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Chart builders for the sales analysis, written against the object-oriented Figure API so they
+can be shown interactively or rendered headless (Agg) in worker processes
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def draw_category_bar(fig, category_sales):
+    # Chart 1: Bar chart – Sales by category
+    ax = fig.subplots()
+    ax.bar(category_sales.index, category_sales.values, color="skyblue")
+    ax.set_title("Total Sales by Product Category")
+    ax.set_xlabel("Product Category")
+    ax.set_ylabel("Total Sales")
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+
+
+def draw_category_pie(fig, category_sales):
+    # Chart 2: Pie chart – Sales distribution
+    ax = fig.subplots()
+    ax.pie(category_sales.values, labels=category_sales.index, autopct="%1.1f%%", startangle=90)
+    ax.set_title("Sales Distribution by Category")
+    ax.axis("equal")
+    fig.tight_layout()
+
+
+def draw_monthly_trend(fig, monthly_sales):
+    # Chart 3: Line chart – Monthly sales trend
+    ax = fig.subplots()
+    ax.plot(monthly_sales.index, monthly_sales.values, marker="o", color="green")
+    ax.set_title("Monthly Sales Trend")
+    ax.set_xlabel("Year-Month")
+    ax.set_ylabel("Total Sales")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.grid(True)
+    fig.tight_layout()
+
+
+# File name -> (figure size, draw function, which series it plots)
+CHARTS = {
+    "Total Sales": ((8, 5), draw_category_bar, "category_sales"),
+    "Sales_Distribution": ((6, 6), draw_category_pie, "category_sales"),
+    "Monthly Sales Trend": ((10, 5), draw_monthly_trend, "monthly_sales"),
+}
+
+
+def render_chart(name, series, output_dir, fmt="png", dpi=100):
+    """
+    Render one chart to `output_dir` with the Agg canvas and return the written path
+    """
+    figsize, draw, _ = CHARTS[name]
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig, series)
+    path = os.path.join(output_dir, f"{name}.{fmt}")
+    fig.savefig(path, format=fmt, dpi=dpi)
+    return path
+
+
+def render_all(category_sales, monthly_sales, output_dir, formats=("png",), dpi=100, workers=None):
+    """
+    Render every chart in every format concurrently in a process pool.
+    Returns (written paths, wall time in seconds).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    data = {"category_sales": category_sales, "monthly_sales": monthly_sales}
+    jobs = [(name, data[key], fmt) for name, (_, _, key) in CHARTS.items() for fmt in formats]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(len(jobs), workers or os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(render_chart, name, series, output_dir, fmt, dpi) for name, series, fmt in jobs]
+        paths = [future.result() for future in futures]
+    return paths, time.perf_counter() - start
@@ -1,156 +1,369 @@
+import argparse
+import os
+from collections import Counter
+
 import pandas as pd
 import matplotlib.pyplot as plt
-import os
+
+from sales_pipeline import (
+    DEFAULT_CHUNKSIZE,
+    SALES_SCHEMA,
+    SalesAggregates,
+    add_features,
+    build_insights,
+    clean_sales,
+    read_sales,
+    resolve_inputs,
+    stream_sales,
+    summarize_partitions,
+)
+from charts import CHARTS, render_all
+from sales_cube import CUBE_COLUMNS, build_cube, load_cube, save_cube
+from sales_incremental import update_incremental
+from sales_cache import CACHE_AVAILABLE, read_cache, to_cache_types, write_cache
 
 # --------------------------------
 # 1. CONFIGURATION
 # --------------------------------
 FILE_PATH = os.path.join(os.path.dirname(__file__), "data", "sales.csv")  # Change to .xlsx if needed
-
-# --------------------------------
-# 2. DATA LOADING WITH ERROR HANDLING
-# --------------------------------
-try:
-    if not os.path.exists(FILE_PATH):
-        raise FileNotFoundError(f"File not found at path: {FILE_PATH}")
-
-    file_ext = os.path.splitext(FILE_PATH)[1].lower()
-
-    if file_ext == ".csv":
-        df = pd.read_csv(FILE_PATH, encoding="latin1")
-    elif file_ext in [".xlsx", ".xls"]:
-        df = pd.read_excel(FILE_PATH)
+CHART_DIR = os.path.join(os.path.dirname(__file__), "visualizations")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sales data analysis")
+    parser.add_argument(
+        "--input",
+        default=FILE_PATH,
+        help="Sales file, or a directory / glob of CSV partitions (default: data/sales.csv)",
+    )
+    # Mutually exclusive run modes; partitioned --input is a mode of its own
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the CSV in fixed-size chunks and keep only running aggregates in memory",
+    )
+    modes.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process rows appended since the last run (state is kept next to the CSV)",
+    )
+    modes.add_argument(
+        "--cube",
+        action="store_true",
+        help="Answer the report from the persisted sales cube, building it first if the source changed",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help=f"Rows per chunk for --stream, --incremental and partitioned input (default: {DEFAULT_CHUNKSIZE})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the source file instead of using the columnar cache next to it",
+    )
+    parser.add_argument(
+        "--verify-cache",
+        action="store_true",
+        help="Check the source file's content hash even when its size and mtime are unchanged",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["c", "pyarrow"],
+        help="CSV parser engine (default: c; pyarrow is multi-threaded). Whole-file and --cube runs only",
+    )
+    parser.add_argument(
+        "--all-columns",
+        action="store_true",
+        help="Parse every column instead of only the ones the analysis needs",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Render the charts to files with the Agg backend instead of showing them",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=CHART_DIR,
+        help="Where --headless writes the charts (default: visualizations/)",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=["png", "svg"],
+        default=["png"],
+        help="File formats written by --headless (default: png)",
+    )
+    parser.add_argument("--dpi", type=int, default=100, help="Resolution of raster charts (default: 100)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for partitioned input and --headless rendering (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    args.paths = resolve_inputs(args.input)
+    args.partitioned = len(args.paths) != 1 or args.paths[0] != args.input
+    if args.partitioned:
+        mode = "partitioned --input"
     else:
-        raise ValueError(f"Unsupported file type: {file_ext}")
-
-    print("✅ Data loaded successfully.\n")
-except Exception as e:
-    print("❌ Error loading file:", e)
-    exit()
+        mode = next((flag for flag in ("--cube", "--incremental", "--stream") if getattr(args, flag[2:])), None)
+
+    # Options each mode would silently ignore
+    given = {
+        "--stream": args.stream,
+        "--incremental": args.incremental,
+        "--cube": args.cube,
+        "--chunksize": args.chunksize is not None,
+        "--engine": args.engine is not None,
+        "--all-columns": args.all_columns,
+        "--no-cache": args.no_cache,
+        "--verify-cache": args.verify_cache,
+    }
+    unsupported = {
+        "partitioned --input": ["--stream", "--incremental", "--cube", "--engine", "--all-columns", "--no-cache", "--verify-cache"],
+        "--cube": ["--chunksize", "--all-columns"],
+        "--incremental": ["--engine", "--all-columns", "--no-cache", "--verify-cache"],
+        "--stream": ["--engine", "--all-columns", "--no-cache", "--verify-cache"],
+        None: ["--chunksize"],
+    }[mode]
+    rejected = [flag for flag in unsupported if given[flag]]
+    if rejected:
+        parser.error(f"{', '.join(rejected)} cannot be used with {mode or 'a whole-file run'}")
+
+    args.chunksize = args.chunksize or DEFAULT_CHUNKSIZE
+    args.engine = args.engine or "c"
+    return args
 
-print("First 5 rows of raw data:")
-print(df.head(), "\n")
 
 # --------------------------------
-# 3. DATA CLEANING & VALIDATION
-# --------------------------------
-
-# ✅ Use your actual column names
-category_col = "PRODUCTLINE"
-sales_col = "SALES"
-date_col = "ORDERDATE"
-
-# Drop rows where critical data is missing
-df = df.dropna(subset=[category_col, sales_col])
-
-# Ensure Sales is numeric
-df[sales_col] = pd.to_numeric(df[sales_col], errors="coerce")
-df = df.dropna(subset=[sales_col])
-
-# Clean Category names
-df[category_col] = df[category_col].astype(str).str.strip().str.title()
-
-# Convert date column
-df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-df = df.dropna(subset=[date_col])
-
-print("✅ Data after cleaning:")
-print(df.head(), "\n")
-print("Data info:")
-print(df.info(), "\n")
-
-# --------------------------------
-# 4. FEATURE ENGINEERING
-# --------------------------------
-df["YearMonth"] = df[date_col].dt.to_period("M").astype(str)
-
-# --------------------------------
-# 5. ANALYSIS
-# --------------------------------
-
-# Total sales by category
-category_sales = df.groupby(category_col)[sales_col].sum().sort_values(ascending=False)
-
-# Monthly sales trend
-monthly_sales = df.groupby("YearMonth")[sales_col].sum()
-
-# Basic metrics
-total_sales = df[sales_col].sum()
-avg_sale = df[sales_col].mean()
-max_sale = df[sales_col].max()
-min_sale = df[sales_col].min()
-
-print("✅ Total sales by category:")
-print(category_sales, "\n")
-
-print("✅ Monthly sales:")
-print(monthly_sales, "\n")
-
-print("✅ Overall metrics:")
-print(f"Total Sales: {total_sales:.2f}")
-print(f"Average Sale Amount: {avg_sale:.2f}")
-print(f"Max Single Sale: {max_sale:.2f}")
-print(f"Min Single Sale: {min_sale:.2f}\n")
-
-# --------------------------------
-# 6. VISUALIZATION (2+ charts)
-# --------------------------------
-
-# Chart 1: Bar chart – Sales by category
-plt.figure(figsize=(8, 5))
-plt.bar(category_sales.index, category_sales.values, color="skyblue")
-plt.title("Total Sales by Product Category")
-plt.xlabel("Product Category")
-plt.ylabel("Total Sales")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
-
-# Chart 2: Pie chart – Sales distribution
-plt.figure(figsize=(6, 6))
-plt.pie(category_sales.values, labels=category_sales.index, autopct="%1.1f%%", startangle=90)
-plt.title("Sales Distribution by Category")
-plt.axis("equal")
-plt.tight_layout()
-plt.show()
-
-# Chart 3: Line chart – Monthly sales trend
-plt.figure(figsize=(10, 5))
-plt.plot(monthly_sales.index, monthly_sales.values, marker="o", color="green")
-plt.title("Monthly Sales Trend")
-plt.xlabel("Year-Month")
-plt.ylabel("Total Sales")
-plt.xticks(rotation=45)
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-
-# --------------------------------
-# 7. TEXTUAL INSIGHTS
+# 2. DATA LOADING WITH ERROR HANDLING
 # --------------------------------
-print("\n📌 INSIGHTS:")
-
-# 1. Best performing category
-top_category = category_sales.idxmax()
-top_value = category_sales.max()
-print(f"1) Best performing category: '{top_category}' with total sales of {top_value:.2f}.")
+def load_data(path, columns=None, engine="c"):
+    try:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found at path: {path}")
+
+        file_ext = os.path.splitext(path)[1].lower()
+
+        if file_ext == ".csv":
+            df = read_sales(path, columns=columns, engine=engine)
+        elif file_ext in [".xlsx", ".xls"]:
+            df = pd.read_excel(path, usecols=columns)
+        else:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+
+        print("✅ Data loaded successfully.\n")
+    except Exception as e:
+        print("❌ Error loading file:", e)
+        exit()
+    return df
+
+
+def load_streaming(path, chunksize, stats):
+    try:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found at path: {path}")
+        if os.path.splitext(path)[1].lower() != ".csv":
+            raise ValueError("Streaming mode only supports .csv files")
+
+        aggregates = stream_sales(path, chunksize=chunksize, stats=stats)
+        print(f"✅ Data streamed successfully in chunks of {chunksize:,} rows.\n")
+    except Exception as e:
+        print("❌ Error loading file:", e)
+        exit()
+    return aggregates
+
+
+def print_cleaning_stats(stats):
+    dropped = stats["missing_values"] + stats["invalid_sales"] + stats["invalid_quantities"] + stats["invalid_dates"]
+    if dropped:
+        print(
+            f"⚠️ Dropped {dropped:,} of {stats['rows_read']:,} rows: "
+            f"{stats['missing_values']:,} missing values, "
+            f"{stats['invalid_sales']:,} invalid sales, "
+            f"{stats['invalid_quantities']:,} invalid quantities, "
+            f"{stats['invalid_dates']:,} dates not matching {SALES_SCHEMA['date_format']!r}.\n"
+        )
+
+
+def load_incremental(path, chunksize, stats):
+    try:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found at path: {path}")
+        if os.path.splitext(path)[1].lower() != ".csv":
+            raise ValueError("Incremental mode only supports .csv files")
+
+        aggregates, new_rows, full = update_incremental(path, chunksize=chunksize, stats=stats)
+        if full:
+            print(f"✅ No reusable state (first run or file rewritten); processed all {new_rows:,} rows.\n")
+        else:
+            print(f"✅ Processed {new_rows:,} rows appended since the last run.\n")
+    except Exception as e:
+        print("❌ Error loading file:", e)
+        exit()
+    return aggregates
+
+
+def load_from_cube(path, engine="c", use_cache=True, verify_cache=False):
+    cube = load_cube(path, verify_hash=verify_cache) if os.path.exists(path) else None
+    if cube is not None:
+        print("✅ Sales cube loaded; the source file was not read.\n")
+        return cube
+
+    df = load_and_clean(path, columns=CUBE_COLUMNS, engine=engine, use_cache=use_cache, verify_cache=verify_cache)
+    cube = build_cube(df)
+    saved = save_cube(path, cube)
+    print(f"✅ Sales cube built with {len(cube.cells):,} cells{' and saved' if saved else ''}.\n")
+    return cube
+
+
+def load_partitions(paths, chunksize, workers, stats):
+    try:
+        if not paths:
+            raise FileNotFoundError("No CSV partitions matched the input")
+        aggregates = summarize_partitions(paths, chunksize=chunksize, workers=workers, stats=stats)
+        print(f"✅ {len(paths):,} partitions summarized successfully.\n")
+    except Exception as e:
+        print("❌ Error loading file:", e)
+        exit()
+    return aggregates
+
+
+def load_and_clean(path, columns=None, engine="c", use_cache=True, verify_cache=False):
+    df = None
+    if use_cache:
+        if not CACHE_AVAILABLE:
+            print("ℹ️ pyarrow is not installed; columnar cache disabled.\n")
+        elif os.path.exists(path):
+            df = read_cache(path, columns=columns, verify_hash=verify_cache)
+
+    if df is not None:
+        print("✅ Data loaded from columnar cache.\n")
+    else:
+        df = load_data(path, columns=columns, engine=engine)
+
+        print("First 5 rows of raw data:")
+        print(df.head(), "\n")
+
+        # --------------------------------
+        # 3. DATA CLEANING & VALIDATION
+        # --------------------------------
+        stats = Counter()
+        df = to_cache_types(clean_sales(df, stats))
+        print_cleaning_stats(stats)
+        if use_cache and write_cache(path, df, all_columns=columns is None):
+            print("✅ Columnar cache written.\n")
+
+    print("✅ Data after cleaning:")
+    print(df.head(), "\n")
+    print("Data info:")
+    print(df.info(), "\n")
+
+    # --------------------------------
+    # 4. FEATURE ENGINEERING
+    # --------------------------------
+    return add_features(df)
+
+
+def main():
+    args = parse_args()
+    columns = None if args.all_columns else SALES_SCHEMA["required"]
+
+    if args.partitioned:
+        # Each partition is cleaned and aggregated in its own process, then merged
+        stats = Counter()
+        aggregates = load_partitions(args.paths, args.chunksize, args.workers, stats)
+        print_cleaning_stats(stats)
+    elif args.cube:
+        # Category and monthly totals are cube queries rather than groupbys over the rows
+        cube = load_from_cube(
+            args.input,
+            engine=args.engine,
+            use_cache=not args.no_cache,
+            verify_cache=args.verify_cache,
+        )
+        aggregates = cube.to_aggregates()
+    elif args.incremental:
+        # Only the new tail of the file is cleaned and folded into the saved aggregates
+        stats = Counter()
+        aggregates = load_incremental(args.input, args.chunksize, stats)
+        print_cleaning_stats(stats)
+    elif args.stream:
+        # Sections 3-5 run per chunk inside the streaming loader
+        stats = Counter()
+        aggregates = load_streaming(args.input, args.chunksize, stats)
+        print_cleaning_stats(stats)
+    else:
+        df = load_and_clean(
+            args.input,
+            columns=columns,
+            engine=args.engine,
+            use_cache=not args.no_cache,
+            verify_cache=args.verify_cache,
+        )
+        aggregates = SalesAggregates.from_frame(df)
+
+    # --------------------------------
+    # 5. ANALYSIS
+    # --------------------------------
+
+    # Total sales by category
+    category_sales = aggregates.category_totals()
+
+    # Monthly sales trend
+    monthly_sales = aggregates.monthly_totals()
+
+    # Basic metrics
+    total_sales = aggregates.total
+    avg_sale = aggregates.mean
+    max_sale = aggregates.max
+    min_sale = aggregates.min
+
+    print("✅ Total sales by category:")
+    print(category_sales, "\n")
+
+    print("✅ Monthly sales:")
+    print(monthly_sales, "\n")
+
+    print("✅ Overall metrics:")
+    print(f"Total Sales: {total_sales:.2f}")
+    print(f"Average Sale Amount: {avg_sale:.2f}")
+    print(f"Max Single Sale: {max_sale:.2f}")
+    print(f"Min Single Sale: {min_sale:.2f}\n")
+
+    # --------------------------------
+    # 6. VISUALIZATION (2+ charts)
+    # --------------------------------
+
+    if args.headless:
+        paths, elapsed = render_all(
+            category_sales,
+            monthly_sales,
+            args.output_dir,
+            formats=args.formats,
+            dpi=args.dpi,
+            workers=args.workers,
+        )
+        print(f"✅ Rendered {len(paths)} chart files to {args.output_dir} in {elapsed:.2f}s.")
+    else:
+        series = {"category_sales": category_sales, "monthly_sales": monthly_sales}
+        for figsize, draw, key in CHARTS.values():
+            draw(plt.figure(figsize=figsize), series[key])
+            plt.show()
 
-# 2. Weakest category
-bottom_category = category_sales.idxmin()
-bottom_value = category_sales.min()
-print(f"2) Lowest performing category: '{bottom_category}' with total sales of {bottom_value:.2f}.")
+    # --------------------------------
+    # 7. TEXTUAL INSIGHTS
+    # --------------------------------
+    print("\n📌 INSIGHTS:")
 
-# 3. Category concentration
-top_share = (top_value / total_sales) * 100
-print(f"3) The top category contributes {top_share:.1f}% of total sales.")
+    for line in build_insights(category_sales, monthly_sales, total_sales, avg_sale):
+        print(line)
 
-# 4. Monthly trend insight
-first_month = monthly_sales.index[0]
-last_month = monthly_sales.index[-1]
-trend = "increased" if monthly_sales.iloc[-1] > monthly_sales.iloc[0] else "decreased"
-print(f"4) Sales have {trend} from {first_month} to {last_month}.")
+    print("\n✅ Sales analysis completed successfully.")
 
-# 5. Average ticket size
-print(f"5) The average sale amount is {avg_sale:.2f}.")
 
-print("\n✅ Sales analysis completed successfully.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Columnar on-disk cache for the cleaned sales data (Feather, memory-mapped on read)
+"""
+import hashlib
+import json
+import os
+
+from sales_pipeline import CATEGORICAL_COLS, DATE_COL
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; without it every run parses the source file
+    feather = None
+
+CACHE_AVAILABLE = feather is not None
+CACHE_VERSION = 4
+
+
+def cache_paths(path):
+    """
+    Return the (data, metadata) cache file paths that sit next to the source file
+    """
+    base = os.path.splitext(path)[0]
+    return base + ".cache.feather", base + ".cache.json"
+
+
+def file_hash(path, block_size=1 << 20):
+    """
+    SHA-256 of the file contents, read in blocks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_hash(path)}
+
+
+def to_cache_types(df):
+    """
+    Cast the cleaned frame to the types stored in the cache (schema categoricals as dictionaries)
+    """
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def read_meta(meta_path):
+    """
+    Load a cache metadata file, or None if it is missing, unreadable or from another version
+    """
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def source_unchanged(path, meta, meta_path, verify_hash=False):
+    """
+    True if `path` still matches the fingerprint stored in `meta`.
+
+    Size and mtime are compared first; the content hash is only computed when they differ
+    (so a touched-but-identical file still hits) or when verify_hash is set.
+    """
+    stat = os.stat(path)
+    if stat.st_size != meta["size"]:
+        return False
+    if verify_hash or stat.st_mtime_ns != meta["mtime_ns"]:
+        if file_hash(path) != meta["sha256"]:
+            return False
+        if stat.st_mtime_ns != meta["mtime_ns"]:
+            # Same content under a new mtime: refresh the metadata so the next run skips hashing
+            meta["mtime_ns"] = stat.st_mtime_ns
+            write_json(meta_path, meta)
+    return True
+
+
+def read_cache(path, columns=None, verify_hash=False):
+    """
+    Return the cached cleaned frame for `path`, or None when the cache is missing, stale or
+    lacks any of the requested `columns` (None means every column).
+    """
+    if not CACHE_AVAILABLE:
+        return None
+    data_path, meta_path = cache_paths(path)
+    if not os.path.exists(data_path):
+        return None
+
+    meta = read_meta(meta_path)
+    if meta is None:
+        return None
+    if columns is None:
+        if not meta.get("all_columns"):
+            return None
+    elif not set(columns) <= set(meta["columns"]):
+        return None
+    if not source_unchanged(path, meta, meta_path, verify_hash=verify_hash):
+        return None
+
+    df = feather.read_feather(data_path, columns=columns, memory_map=True)
+    if DATE_COL in df.columns and not str(df[DATE_COL].dtype).startswith("datetime64"):
+        return None
+    return df
+
+
+def write_cache(path, df, all_columns=True):
+    """
+    Store the cleaned frame next to `path`; returns False if the cache could not be written.
+    Pass all_columns=False when `df` was read with a column subset.
+    """
+    if not CACHE_AVAILABLE:
+        return False
+    data_path, meta_path = cache_paths(path)
+    meta = {
+        "version": CACHE_VERSION,
+        "columns": list(df.columns),
+        "all_columns": all_columns,
+        **file_fingerprint(path),
+    }
+    tmp_path = data_path + ".tmp"
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    try:
+        # Uncompressed so the file can be memory-mapped instead of decoded on read
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, data_path)
+        write_json(meta_path, meta)
+    except Exception as e:
+        print("⚠️ Could not write columnar cache:", e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    return True
+
+
+def write_json(path, payload):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
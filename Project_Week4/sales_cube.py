@@ -0,0 +1,202 @@
+"""
+Precomputed OLAP cube over the sales data.
+
+Every grouping set along the dimension hierarchies is aggregated once (from the finest-grain
+cuboid, not the raw rows) and persisted, so slice / dice / drill-down questions are answered
+from the cube in time proportional to the number of cells instead of another pass over sales.csv.
+"""
+import itertools
+import os
+
+import pandas as pd
+
+from sales_cache import CACHE_AVAILABLE, CACHE_VERSION, feather, file_fingerprint, read_meta, source_unchanged, write_json
+from sales_pipeline import CATEGORY_COL, DATE_COL, QUANTITY_COL, SALES_COL, SalesAggregates
+
+# Rollup hierarchies, coarse to fine. A grouping set takes a prefix of each one.
+HIERARCHIES = [
+    [CATEGORY_COL],
+    ["TERRITORY", "COUNTRY"],
+    ["YEAR_ID", "QTR_ID", "MONTH_ID"],
+    ["DEALSIZE"],
+]
+DIMENSIONS = [dim for hierarchy in HIERARCHIES for dim in hierarchy]
+TIME_DIMENSIONS = ["YEAR_ID", "QTR_ID", "MONTH_ID"]
+
+# Measure -> how cells of a finer grouping set combine into a coarser one
+MEASURES = {
+    "SALES_SUM": "sum",
+    "QUANTITY_SUM": "sum",
+    "COUNT": "sum",
+    "SALES_MIN": "min",
+    "SALES_MAX": "max",
+}
+
+# Columns build_cube needs from the cleaned sales data (time dimensions come from ORDERDATE)
+CUBE_COLUMNS = [CATEGORY_COL, SALES_COL, DATE_COL, QUANTITY_COL, "TERRITORY", "COUNTRY", "DEALSIZE"]
+
+
+def grouping_sets():
+    """
+    Every combination of hierarchy prefixes, from the full grain down to the grand total
+    """
+    prefixes = [[tuple(h[:i]) for i in range(len(h), -1, -1)] for h in HIERARCHIES]
+    return [sum(combo, ()) for combo in itertools.product(*prefixes)]
+
+
+def grouping_id(dims):
+    """
+    SQL-style GROUPING_ID: bit i is set when DIMENSIONS[i] is rolled up
+    """
+    return sum(1 << i for i, dim in enumerate(DIMENSIONS) if dim not in dims)
+
+
+def _rollup(cells, dims):
+    aggs = {measure: (measure, how) for measure, how in MEASURES.items()}
+    if not dims:
+        return pd.DataFrame({measure: [getattr(cells[measure], how)()] for measure, how in MEASURES.items()})
+    return cells.groupby(list(dims), observed=True, dropna=False).agg(**aggs).reset_index()
+
+
+class SalesCube:
+    """
+    Cube cells for every grouping set, with a query API for slices, dices and drill-downs
+    """
+
+    def __init__(self, cells):
+        self.cells = cells
+        self._sets = {int(gid): frame for gid, frame in cells.groupby("GROUPING_ID", sort=False)}
+
+    def query(self, by=(), where=None):
+        """
+        Measures grouped by the dimensions in `by`, restricted by `where`.
+
+        `where` maps a dimension to a value or a list of values, e.g.
+        cube.query(by=["PRODUCTLINE"], where={"YEAR_ID": 2004, "TERRITORY": ["EMEA", "APAC"]}).
+        Returns a DataFrame indexed by `by`, or a Series of totals when `by` is empty.
+        """
+        by = list(by)
+        where = where or {}
+        needed = set(by) | set(where)
+        unknown = needed - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions: {sorted(unknown)}")
+
+        # Smallest grouping set that still keeps every dimension we need
+        candidates = [dims for dims in grouping_sets() if needed <= set(dims)]
+        dims = min(candidates, key=lambda d: len(self._cells_for(d)))
+        cells = self._cells_for(dims)
+
+        for dim, value in where.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            cells = cells[cells[dim].isin(values)]
+
+        result = _rollup(cells, by)
+        if not by:
+            return result.iloc[0]
+        return result.set_index(by)
+
+    def _cells_for(self, dims):
+        return self._sets.get(grouping_id(dims), self.cells.iloc[:0])
+
+    def slice(self, dim, value, by=()):
+        """
+        Fix one dimension to a single value
+        """
+        return self.query(by=by, where={dim: value})
+
+    def drill_down(self, by, dim, where=None):
+        """
+        Break the current view (`by`) down one more level by `dim`
+        """
+        return self.query(by=list(by) + [dim], where=where)
+
+    def to_aggregates(self):
+        """
+        The report aggregates used by main.py, read from the cube instead of raw rows
+        """
+        totals = self.query()
+        monthly = self.query(by=["YEAR_ID", "MONTH_ID"])["SALES_SUM"]
+        monthly.index = [f"{year:04d}-{month:02d}" for year, month in monthly.index]
+
+        aggregates = SalesAggregates()
+        aggregates.category_sales = self.query(by=[CATEGORY_COL])["SALES_SUM"]
+        aggregates.monthly_sales = monthly
+        aggregates.count = int(totals["COUNT"])
+        aggregates.total = float(totals["SALES_SUM"])
+        aggregates.max = float(totals["SALES_MAX"])
+        aggregates.min = float(totals["SALES_MIN"])
+        return aggregates
+
+
+def build_cube(df):
+    """
+    Build the cube from cleaned sales rows (see CUBE_COLUMNS)
+    """
+    df = df.assign(
+        YEAR_ID=df[DATE_COL].dt.year,
+        QTR_ID=df[DATE_COL].dt.quarter,
+        MONTH_ID=df[DATE_COL].dt.month,
+    )
+    # The only pass over the rows: the finest-grain cuboid
+    base = (
+        df.groupby(DIMENSIONS, observed=True, dropna=False)
+        .agg(
+            SALES_SUM=(SALES_COL, "sum"),
+            QUANTITY_SUM=(QUANTITY_COL, "sum"),
+            COUNT=(SALES_COL, "size"),
+            SALES_MIN=(SALES_COL, "min"),
+            SALES_MAX=(SALES_COL, "max"),
+        )
+        .reset_index()
+    )
+
+    frames = []
+    for dims in grouping_sets():
+        cells = base if len(dims) == len(DIMENSIONS) else _rollup(base, dims)
+        frames.append(cells.assign(GROUPING_ID=grouping_id(dims)))
+    cells = pd.concat(frames, ignore_index=True)
+
+    for dim in DIMENSIONS:
+        cells[dim] = cells[dim].astype("Int64" if dim in TIME_DIMENSIONS else "category")
+    return SalesCube(cells[DIMENSIONS + ["GROUPING_ID"] + list(MEASURES)])
+
+
+def cube_paths(path):
+    base = os.path.splitext(path)[0]
+    return base + ".cube.feather", base + ".cube.json"
+
+
+def load_cube(path, verify_hash=False):
+    """
+    The persisted cube for source file `path`, or None if it is missing or stale
+    """
+    if not CACHE_AVAILABLE:
+        return None
+    data_path, meta_path = cube_paths(path)
+    meta = read_meta(meta_path)
+    if meta is None or not os.path.exists(data_path):
+        return None
+    if not source_unchanged(path, meta, meta_path, verify_hash=verify_hash):
+        return None
+    return SalesCube(feather.read_feather(data_path, memory_map=True))
+
+
+def save_cube(path, cube):
+    """
+    Persist the cube next to source file `path`; returns False if it could not be written
+    """
+    if not CACHE_AVAILABLE:
+        return False
+    data_path, meta_path = cube_paths(path)
+    meta = {"version": CACHE_VERSION, **file_fingerprint(path)}
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    try:
+        feather.write_feather(cube.cells, data_path + ".tmp", compression="uncompressed")
+        os.replace(data_path + ".tmp", data_path)
+        write_json(meta_path, meta)
+    except Exception as e:
+        print("⚠️ Could not write sales cube:", e)
+        return False
+    return True
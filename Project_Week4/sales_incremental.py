@@ -0,0 +1,146 @@
+"""
+Incremental re-runs: persist the aggregate state plus the byte offset already processed, so a
+re-run of an append-only sales.csv only parses the new tail
+"""
+import csv
+import hashlib
+import json
+import os
+from collections import Counter
+
+from sales_pipeline import CSV_ENCODING, DEFAULT_CHUNKSIZE, SalesAggregates, stream_sales
+
+STATE_VERSION = 1
+# Bytes hashed at the start of the file and just before the saved offset to detect rewrites
+SAMPLE_SIZE = 1 << 16
+
+
+def state_path(path):
+    return os.path.splitext(path)[0] + ".state.json"
+
+
+class _BoundedReader:
+    """
+    Read-only view of an open binary file that stops at `end`, so a half-written last line is
+    left for the next run
+    """
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def read(self, size=-1):
+        remaining = max(self._end - self._f.tell(), 0)
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self._f.read(size)
+
+    def __iter__(self):
+        return iter(self.read().splitlines(keepends=True))
+
+
+def _complete_end(f, size):
+    """
+    Offset just past the last newline in the file (0 if there is none)
+    """
+    pos = size
+    while pos > 0:
+        start = max(pos - SAMPLE_SIZE, 0)
+        f.seek(start)
+        block = f.read(pos - start)
+        idx = block.rfind(b"\n")
+        if idx != -1:
+            return start + idx + 1
+        pos = start
+    return 0
+
+
+def _sample_hash(f, start, end):
+    f.seek(start)
+    return hashlib.sha256(f.read(end - start)).hexdigest()
+
+
+def _fingerprint(f, offset):
+    return {
+        "head_sha256": _sample_hash(f, 0, min(SAMPLE_SIZE, offset)),
+        "tail_sha256": _sample_hash(f, max(offset - SAMPLE_SIZE, 0), offset),
+    }
+
+
+def load_state(path):
+    try:
+        with open(state_path(path), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def save_state(path, state):
+    target = state_path(path)
+    tmp_path = target + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, target)
+
+
+def _is_append(f, size, state):
+    """
+    True if the file still starts with the bytes processed last time (it was only appended to)
+    """
+    offset = state["offset"]
+    return size >= offset and _fingerprint(f, offset) == state["fingerprint"]
+
+
+def update_incremental(path, chunksize=DEFAULT_CHUNKSIZE, stats=None):
+    """
+    Bring the persisted aggregates for `path` up to date.
+
+    Returns (aggregates, rows read this run, whether a full recompute was needed). The
+    cleaning counts for the whole file are accumulated into `stats`.
+    """
+    if stats is None:
+        stats = Counter()
+    state = load_state(path)
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        columns = next(csv.reader([header.decode(CSV_ENCODING)]))
+        full = state is None or state["columns"] != columns or not _is_append(f, size, state)
+
+        if full:
+            offset = len(header)
+            aggregates = SalesAggregates()
+            previous_stats = Counter()
+        else:
+            offset = state["offset"]
+            aggregates = SalesAggregates.from_dict(state["aggregates"])
+            previous_stats = Counter(state["stats"])
+
+        end = _complete_end(f, size)
+        run_stats = Counter()
+        if end > offset:
+            f.seek(offset)
+            stream_sales(
+                _BoundedReader(f, end),
+                chunksize=chunksize,
+                stats=run_stats,
+                aggregates=aggregates,
+                names=columns,
+            )
+            offset = end
+
+        stats.update(previous_stats + run_stats)
+        save_state(
+            path,
+            {
+                "version": STATE_VERSION,
+                "columns": columns,
+                "offset": offset,
+                "fingerprint": _fingerprint(f, offset),
+                "aggregates": aggregates.to_dict(),
+                "stats": dict(previous_stats + run_stats),
+            },
+        )
+    return aggregates, run_stats["rows_read"], full
@@ -0,0 +1,322 @@
+"""
+Loading, cleaning and aggregation helpers shared by the sales analysis in main.py
+"""
+import glob
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+# ✅ Column names used by the analysis
+CATEGORY_COL = "PRODUCTLINE"
+SALES_COL = "SALES"
+QUANTITY_COL = "QUANTITYORDERED"
+DATE_COL = "ORDERDATE"
+MONTH_COL = "YearMonth"
+
+CSV_ENCODING = "latin1"
+DEFAULT_CHUNKSIZE = 100_000
+
+# Declared layout of sales.csv. Text columns are typed while parsing; SALES, QUANTITYORDERED
+# and ORDERDATE are validated in clean_sales so bad values can be counted instead of raising.
+SALES_SCHEMA = {
+    "columns": {
+        "ORDERNUMBER": "int64",
+        "QUANTITYORDERED": "int64",
+        "PRICEEACH": "float64",
+        "ORDERLINENUMBER": "int64",
+        "SALES": "float64",
+        "ORDERDATE": "datetime64[ns]",
+        "STATUS": "category",
+        "QTR_ID": "int64",
+        "MONTH_ID": "int64",
+        "YEAR_ID": "int64",
+        "PRODUCTLINE": "category",
+        "MSRP": "int64",
+        "PRODUCTCODE": "str",
+        "CUSTOMERNAME": "str",
+        "PHONE": "str",
+        "ADDRESSLINE1": "str",
+        "ADDRESSLINE2": "str",
+        "CITY": "str",
+        "STATE": "str",
+        "POSTALCODE": "str",
+        "COUNTRY": "category",
+        "TERRITORY": "category",
+        "CONTACTLASTNAME": "str",
+        "CONTACTFIRSTNAME": "str",
+        "DEALSIZE": "category",
+    },
+    "date_format": "%m/%d/%Y %H:%M",
+    "required": [CATEGORY_COL, SALES_COL, DATE_COL],
+}
+
+CATEGORICAL_COLS = [col for col, dtype in SALES_SCHEMA["columns"].items() if dtype == "category"]
+
+
+def read_dtypes(columns=None):
+    """
+    dtype mapping for read_csv: text columns from the schema, limited to `columns` if given
+    """
+    dtypes = {}
+    for col, dtype in SALES_SCHEMA["columns"].items():
+        if columns is not None and col not in columns:
+            continue
+        if dtype == "category":
+            dtypes[col] = "category"
+        elif dtype == "str" or dtype.startswith("datetime64"):
+            # Dates are read as text and parsed with the declared format in clean_sales
+            dtypes[col] = str
+    return dtypes
+
+
+def read_sales(path, columns=None, engine="c", chunksize=None, names=None):
+    """
+    Read the sales CSV with the declared schema; `columns` limits parsing to those columns.
+    Pass `names` when the input has no header row (e.g. a tail of the file).
+    Returns a DataFrame, or an iterator of DataFrames when chunksize is set (C engine only).
+    """
+    return pd.read_csv(
+        path,
+        encoding=CSV_ENCODING,
+        header=None if names else "infer",
+        names=names,
+        # Only empty fields are missing: "NA" is the North America TERRITORY, not a null
+        keep_default_na=False,
+        na_values=[""],
+        usecols=columns,
+        dtype=read_dtypes(columns),
+        engine=engine,
+        chunksize=chunksize,
+    )
+
+
+def _clean_labels(labels):
+    """
+    Strip and title-case labels; categoricals only clean their categories, not every row
+    """
+    if isinstance(labels.dtype, pd.CategoricalDtype):
+        categories = labels.cat.categories
+        cleaned = categories.astype(str).str.strip().str.title()
+        if cleaned.is_unique:
+            return labels.cat.rename_categories(cleaned)
+        return labels.map(dict(zip(categories, cleaned))).astype("category")
+    return labels.astype(str).str.strip().str.title()
+
+
+def clean_sales(df, stats=None):
+    """
+    Drop incomplete rows and normalise the category, sales, quantity (when read) and date columns.
+
+    If `stats` (a Counter) is given, the number of rows dropped for each reason is added to it.
+    """
+    if stats is None:
+        stats = Counter()
+    stats["rows_read"] += len(df)
+
+    # Drop rows where critical data is missing
+    rows = len(df)
+    df = df.dropna(subset=[CATEGORY_COL, SALES_COL])
+    stats["missing_values"] += rows - len(df)
+
+    # Ensure Sales is numeric
+    df[SALES_COL] = pd.to_numeric(df[SALES_COL], errors="coerce")
+    rows = len(df)
+    df = df.dropna(subset=[SALES_COL])
+    stats["invalid_sales"] += rows - len(df)
+
+    # Quantities must be whole numbers; they are summed as int64 (e.g. by the sales cube)
+    if QUANTITY_COL in df.columns:
+        quantity = pd.to_numeric(df[QUANTITY_COL], errors="coerce")
+        df[QUANTITY_COL] = quantity.where(quantity % 1 == 0)
+        rows = len(df)
+        df = df.dropna(subset=[QUANTITY_COL])
+        stats["invalid_quantities"] += rows - len(df)
+        df[QUANTITY_COL] = df[QUANTITY_COL].astype("int64")
+
+    # Clean Category names
+    df[CATEGORY_COL] = _clean_labels(df[CATEGORY_COL])
+
+    # Convert date column using the declared format
+    df[DATE_COL] = pd.to_datetime(df[DATE_COL], format=SALES_SCHEMA["date_format"], errors="coerce")
+    rows = len(df)
+    df = df.dropna(subset=[DATE_COL])
+    stats["invalid_dates"] += rows - len(df)
+    return df
+
+
+def add_features(df):
+    """
+    Add the YearMonth column used by the monthly trend
+    """
+    df[MONTH_COL] = df[DATE_COL].dt.to_period("M").astype(str)
+    return df
+
+
+class SalesAggregates:
+    """
+    Running totals behind the report; can be updated chunk by chunk and merged across partitions
+    """
+
+    def __init__(self):
+        self.category_sales = pd.Series(dtype="float64")
+        self.monthly_sales = pd.Series(dtype="float64")
+        self.count = 0
+        self.total = 0.0
+        self.max = float("-inf")
+        self.min = float("inf")
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build the aggregates from a cleaned frame that already has YearMonth
+        """
+        return cls().update(df)
+
+    def update(self, df):
+        """
+        Fold a cleaned frame (with YearMonth) into the running state
+        """
+        if df.empty:
+            return self
+        sales = df[SALES_COL]
+        category_sales = df.groupby(CATEGORY_COL, observed=True)[SALES_COL].sum()
+        monthly_sales = df.groupby(MONTH_COL, observed=True)[SALES_COL].sum()
+        self._combine(category_sales, monthly_sales, len(sales), float(sales.sum()), float(sales.max()), float(sales.min()))
+        return self
+
+    def merge(self, other):
+        """
+        Fold another partial result (e.g. from a different chunk or file) into this one
+        """
+        if other.count:
+            self._combine(other.category_sales, other.monthly_sales, other.count, other.total, other.max, other.min)
+        return self
+
+    def _combine(self, category_sales, monthly_sales, count, total, max_sale, min_sale):
+        self.category_sales = self.category_sales.add(category_sales, fill_value=0)
+        self.monthly_sales = self.monthly_sales.add(monthly_sales, fill_value=0)
+        self.count += count
+        self.total += total
+        self.max = max(self.max, max_sale)
+        self.min = min(self.min, min_sale)
+
+    def to_dict(self):
+        """
+        JSON-serialisable state, e.g. for persisting between incremental runs
+        """
+        return {
+            "category_sales": {str(k): float(v) for k, v in self.category_sales.items()},
+            "monthly_sales": {str(k): float(v) for k, v in self.monthly_sales.items()},
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "min": self.min,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        aggregates = cls()
+        aggregates.category_sales = pd.Series(state["category_sales"], dtype="float64")
+        aggregates.monthly_sales = pd.Series(state["monthly_sales"], dtype="float64")
+        aggregates.count = state["count"]
+        aggregates.total = state["total"]
+        aggregates.max = state["max"]
+        aggregates.min = state["min"]
+        return aggregates
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+    def category_totals(self):
+        """
+        Total sales by category, best first
+        """
+        return self.category_sales.rename_axis(CATEGORY_COL).rename(SALES_COL).sort_values(ascending=False)
+
+    def monthly_totals(self):
+        """
+        Total sales by YearMonth in calendar order
+        """
+        return self.monthly_sales.rename_axis(MONTH_COL).rename(SALES_COL).sort_index()
+
+
+def build_insights(category_sales, monthly_sales, total_sales, avg_sale):
+    """
+    Textual insights printed at the end of the report, one string per line
+    """
+    lines = []
+
+    # 1. Best performing category
+    top_category = category_sales.idxmax()
+    top_value = category_sales.max()
+    lines.append(f"1) Best performing category: '{top_category}' with total sales of {top_value:.2f}.")
+
+    # 2. Weakest category
+    bottom_category = category_sales.idxmin()
+    bottom_value = category_sales.min()
+    lines.append(f"2) Lowest performing category: '{bottom_category}' with total sales of {bottom_value:.2f}.")
+
+    # 3. Category concentration
+    top_share = (top_value / total_sales) * 100
+    lines.append(f"3) The top category contributes {top_share:.1f}% of total sales.")
+
+    # 4. Monthly trend insight
+    first_month = monthly_sales.index[0]
+    last_month = monthly_sales.index[-1]
+    trend = "increased" if monthly_sales.iloc[-1] > monthly_sales.iloc[0] else "decreased"
+    lines.append(f"4) Sales have {trend} from {first_month} to {last_month}.")
+
+    # 5. Average ticket size
+    lines.append(f"5) The average sale amount is {avg_sale:.2f}.")
+    return lines
+
+
+def stream_sales(path, chunksize=DEFAULT_CHUNKSIZE, columns=None, stats=None, aggregates=None, names=None):
+    """
+    Summarise a CSV in fixed-size chunks so memory stays flat regardless of file size.
+    Pass `aggregates` to keep adding to an existing running state.
+    """
+    if aggregates is None:
+        aggregates = SalesAggregates()
+    reader = read_sales(path, columns=columns or SALES_SCHEMA["required"], chunksize=chunksize, names=names)
+    for chunk in reader:
+        aggregates.update(add_features(clean_sales(chunk, stats)))
+    return aggregates
+
+
+def resolve_inputs(path):
+    """
+    Expand a file, directory (every *.csv inside) or glob pattern into a sorted list of files
+    """
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.csv")))
+    if glob.has_magic(path):
+        return sorted(p for p in glob.glob(path) if os.path.isfile(p))
+    return [path]
+
+
+def summarize_partition(path, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """
+    Worker for partitioned runs: partial aggregates and cleaning counts for one file
+    """
+    stats = Counter()
+    return stream_sales(path, chunksize=chunksize, columns=columns, stats=stats), stats
+
+
+def summarize_partitions(paths, chunksize=DEFAULT_CHUNKSIZE, columns=None, workers=None, stats=None):
+    """
+    Summarise each file in its own worker process and merge the partial aggregates
+    """
+    aggregates = SalesAggregates()
+    if stats is None:
+        stats = Counter()
+    with ProcessPoolExecutor(max_workers=min(len(paths), workers or os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(summarize_partition, path, chunksize, columns) for path in paths]
+        for future in as_completed(futures):
+            partial, partial_stats = future.result()
+            aggregates.merge(partial)
+            stats.update(partial_stats)
+    return aggregates
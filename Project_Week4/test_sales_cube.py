@@ -0,0 +1,41 @@
+from collections import Counter
+
+import pandas as pd
+
+from sales_cube import CUBE_COLUMNS, QUANTITY_COL, build_cube
+from sales_pipeline import clean_sales, read_sales
+
+SALES_CSV = """QUANTITYORDERED,SALES,ORDERDATE,PRODUCTLINE,COUNTRY,TERRITORY,DEALSIZE
+30,2871,2/24/2003 0:00,Motorcycles,USA,NA,Small
+34,2765.9,5/7/2003 0:00,Motorcycles,France,EMEA,Small
+n/a,3884.34,7/1/2003 0:00,Motorcycles,France,EMEA,Medium
+2.5,100,7/1/2003 0:00,Classic Cars,USA,NA,Small
+,200,7/2/2003 0:00,Classic Cars,USA,NA,Small
+45,3746.7,8/25/2003 0:00,Classic Cars,Norway,EMEA,Medium
+"""
+
+
+def cleaned(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(SALES_CSV)
+    stats = Counter()
+    return clean_sales(read_sales(path, columns=CUBE_COLUMNS), stats), stats
+
+
+def test_invalid_quantities_are_dropped_and_counted(tmp_path):
+    df, stats = cleaned(tmp_path)
+    assert stats["invalid_quantities"] == 3
+    assert stats["rows_read"] == 6
+    assert df[QUANTITY_COL].dtype == "int64"
+    assert df[QUANTITY_COL].tolist() == [30, 34, 45]
+
+
+def test_cube_sums_quantities_as_integers(tmp_path):
+    df, _ = cleaned(tmp_path)
+    cube = build_cube(df)
+    assert cube.cells["QUANTITY_SUM"].dtype == "int64"
+    total = cube.query()
+    assert total["QUANTITY_SUM"] == 109
+    assert total["COUNT"] == 3
+    by_territory = cube.query(by=["TERRITORY"])["QUANTITY_SUM"]
+    assert by_territory.to_dict() == {"EMEA": 79, "NA": 30}
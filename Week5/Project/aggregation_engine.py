@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+
+class FactorizedFrame:
+    """Group-by engine that hashes every key column once and reduces integer codes with bincount.
+
+    Groups come out in the same sorted key order as DataFrame.groupby, and rows with a missing
+    key are dropped the same way, so results line up with the pandas equivalents.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._columns = {}
+        self._groups = {}
+
+    def column(self, col: str) -> tuple[np.ndarray, pd.Index]:
+        # Codes are -1 for missing values; uniques are sorted
+        if col not in self._columns:
+            self._columns[col] = pd.factorize(self.df[col], sort=True)
+        return self._columns[col]
+
+    def value_codes(self, col: str) -> tuple[np.ndarray, int]:
+        # Codes for columns that are only counted, never used as keys, so order does not matter.
+        # Dense integer ids (e.g. order_id) are offset instead of hashed.
+        if col in self._columns:
+            codes, uniques = self._columns[col]
+            return codes, len(uniques)
+        values = self.df[col].to_numpy()
+        if values.dtype.kind in "iu" and len(values):
+            low, high = int(values.min()), int(values.max())
+            if high - low < 4 * len(values):
+                return (values - low).astype(np.intp), high - low + 1
+        codes, uniques = pd.factorize(self.df[col])
+        return codes, len(uniques)
+
+    def groups(self, keys: list[str]) -> tuple[np.ndarray, pd.DataFrame]:
+        keys = tuple(keys)
+        if keys not in self._groups and len(keys) == 1:
+            codes, uniques = self.column(keys[0])
+            self._groups[keys] = (codes, pd.DataFrame({keys[0]: uniques}))
+        if keys not in self._groups:
+            combined = np.zeros(len(self.df), dtype=np.int64)
+            valid = np.ones(len(self.df), dtype=bool)
+            for key in keys:
+                codes, uniques = self.column(key)
+                valid &= codes >= 0
+                combined = combined * len(uniques) + codes
+
+            group_codes = np.full(len(self.df), -1, dtype=np.intp)
+            codes, combos = pd.factorize(combined[valid], sort=True)
+            group_codes[valid] = codes
+
+            # Decode the combined codes back into one column per key
+            key_values = {}
+            remaining = np.asarray(combos, dtype=np.int64)
+            for key in reversed(keys):
+                _, uniques = self.column(key)
+                remaining, key_codes = np.divmod(remaining, len(uniques))
+                key_values[key] = uniques.take(key_codes)
+            key_frame = pd.DataFrame({key: key_values[key] for key in keys})
+            self._groups[keys] = (group_codes, key_frame)
+        return self._groups[keys]
+
+    def _reduce(self, group_codes: np.ndarray, n_groups: int, values: np.ndarray | None = None) -> np.ndarray:
+        mask = group_codes >= 0
+        weights = None if values is None else values[mask]
+        return np.bincount(group_codes[mask], weights=weights, minlength=n_groups)
+
+    def size(self, keys: list[str]) -> np.ndarray:
+        group_codes, key_frame = self.groups(keys)
+        return self._reduce(group_codes, len(key_frame))
+
+    def count(self, keys: list[str], col: str) -> np.ndarray:
+        # Non-missing values per group, like groupby().count()
+        group_codes, key_frame = self.groups(keys)
+        present = self.df[col].notna().to_numpy()
+        return self._reduce(np.where(present, group_codes, -1), len(key_frame))
+
+    def sum(self, keys: list[str], col: str) -> np.ndarray:
+        group_codes, key_frame = self.groups(keys)
+        values = self.df[col].to_numpy()
+        if values.dtype.kind in "iub":
+            # Integer weights are exact in float64 up to 2**53, then cast back like groupby.sum
+            return self._reduce(group_codes, len(key_frame), values.astype(np.float64)).astype(np.int64)
+        values = values.astype(np.float64)
+        return self._reduce(group_codes, len(key_frame), np.where(np.isnan(values), 0.0, values))
+
+    def mean(self, keys: list[str], col: str) -> np.ndarray:
+        group_codes, key_frame = self.groups(keys)
+        values = self.df[col].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        totals = self._reduce(group_codes, len(key_frame), np.where(present, values, 0.0))
+        counts = self._reduce(np.where(present, group_codes, -1), len(key_frame))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return totals / counts
+
+    def nunique(self, keys: list[str], col: str) -> np.ndarray:
+        group_codes, key_frame = self.groups(keys)
+        value_codes, n_values = self.value_codes(col)
+        mask = (group_codes >= 0) & (value_codes >= 0)
+        pairs = group_codes[mask].astype(np.int64) * n_values + value_codes[mask]
+        size = len(key_frame) * n_values
+        if size <= 16 * len(pairs):
+            # Small key space: mark (group, value) pairs in a bitmap instead of hashing them
+            seen = np.zeros(size, dtype=bool)
+            seen[pairs] = True
+            return seen.reshape(len(key_frame), n_values).sum(axis=1)
+        # Distinct (group, value) pairs, then count pairs per group
+        return np.bincount(pd.unique(pairs) // n_values, minlength=len(key_frame))
+
+    def pivot_sum(self, index: str, columns: str, col: str) -> pd.DataFrame:
+        # Dense index x columns grid of sums, like pivot_table(aggfunc="sum", fill_value=0)
+        row_codes, row_uniques = self.column(index)
+        col_codes, col_uniques = self.column(columns)
+        mask = (row_codes >= 0) & (col_codes >= 0)
+        cells = row_codes[mask].astype(np.int64) * len(col_uniques) + col_codes[mask]
+        size = len(row_uniques) * len(col_uniques)
+        values = self.df[col].to_numpy(dtype=np.float64)[mask]
+        totals = np.bincount(cells, weights=np.where(np.isnan(values), 0.0, values), minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        totals = totals.reshape(len(row_uniques), len(col_uniques))
+        counts = counts.reshape(len(row_uniques), len(col_uniques))
+
+        # Only labels that occur together with a valid partner, as pivot_table does
+        rows = counts.sum(axis=1) > 0
+        cols = counts.sum(axis=0) > 0
+        return pd.DataFrame(
+            totals[np.ix_(rows, cols)],
+            index=pd.Index(row_uniques[rows], name=index),
+            columns=pd.Index(col_uniques[cols], name=columns),
+        )
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DPI = 150
+
+# Hash of each chart's source aggregate at its last render, stored next to the PNGs
+MANIFEST = ".chart_hashes.json"
+
+
+def draw_top_customers(fig: Figure, data: pd.DataFrame) -> None:
+    ax = fig.subplots()
+    top = data.head(10)
+    sns.barplot(data=top, x="revenue", y="customer_name", hue="customer_name", palette="Blues_d", legend=False, ax=ax)
+    ax.set_title("Top Customers by Revenue")
+    ax.set_xlabel("Revenue")
+    ax.set_ylabel("Customer")
+
+
+def draw_monthly_trend(fig: Figure, data: pd.DataFrame) -> None:
+    ax = fig.subplots()
+    sns.lineplot(data=data, x="order_month", y="monthly_revenue", marker="o", color="#2a9d8f", ax=ax)
+    ax.set_title("Monthly Revenue Trend")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Revenue")
+
+
+def draw_region_product_heatmap(fig: Figure, data: pd.DataFrame) -> None:
+    ax = fig.subplots()
+    sns.heatmap(data, annot=True, fmt=".1f", cmap="YlGnBu", ax=ax)
+    ax.set_title("Revenue by Region and Product")
+    ax.set_xlabel("Product")
+    ax.set_ylabel("Region")
+
+
+def draw_product_revenue(fig: Figure, data: pd.DataFrame) -> None:
+    ax = fig.subplots()
+    sns.barplot(data=data, x="product", y="total_revenue", hue="product", palette="crest", legend=False, ax=ax)
+    ax.set_title("Product Revenue")
+    ax.set_xlabel("Product")
+    ax.set_ylabel("Revenue")
+    ax.tick_params(axis="x", labelrotation=30)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+
+
+# PNG name -> (figsize, draw function, aggregate it is drawn from)
+CHARTS = {
+    "top_customers.png": ((8, 5), draw_top_customers, "top_customers"),
+    "monthly_revenue_trend.png": ((8, 4), draw_monthly_trend, "monthly_trend"),
+    "region_product_heatmap.png": ((8, 5), draw_region_product_heatmap, "pivot_region_product"),
+    "product_revenue.png": ((8, 5), draw_product_revenue, "product_perf"),
+}
+
+
+def frame_hash(frame: pd.DataFrame) -> str:
+    # Values, index and column labels all change the picture
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    digest.update(repr((list(frame.columns), frame.columns.name, frame.index.name)).encode())
+    return digest.hexdigest()
+
+
+def render_chart(name: str, data: pd.DataFrame, output_dir: str, dpi: int = DPI) -> str:
+    # Runs in a worker process: no pyplot state, just a Figure on the Agg canvas
+    sns.set_theme(style="whitegrid")
+    figsize, draw, _ = CHARTS[name]
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig, data)
+    fig.tight_layout()
+    path = os.path.join(output_dir, name)
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def render_charts(aggs: dict, output_dir: Path, dpi: int = DPI, workers: int | None = None, force: bool = False) -> tuple[list[Path], list[str]]:
+    """Render every chart whose source aggregate changed since the last render.
+
+    Returns (all chart paths, names that were rendered). Charts render concurrently in a
+    process pool, so a full render takes about as long as the slowest chart.
+    """
+    manifest_path = output_dir / MANIFEST
+    try:
+        previous = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        previous = {}
+
+    hashes = {}
+    stale = []
+    for name, (figsize, _, key) in CHARTS.items():
+        hashes[name] = f"{frame_hash(aggs[key])}:{figsize}:{dpi}"
+        if force or previous.get(name) != hashes[name] or not (output_dir / name).exists():
+            stale.append(name)
+
+    if len(stale) == 1:
+        render_chart(stale[0], aggs[CHARTS[stale[0]][2]], str(output_dir), dpi)
+    elif stale:
+        with ProcessPoolExecutor(max_workers=min(len(stale), workers or os.cpu_count() or 1)) as pool:
+            futures = [pool.submit(render_chart, name, aggs[CHARTS[name][2]], str(output_dir), dpi) for name in stale]
+            for future in futures:
+                future.result()
+
+    manifest_path.write_text(json.dumps(hashes, indent=2))
+    return [output_dir / name for name in CHARTS], stale
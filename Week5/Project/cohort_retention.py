@@ -0,0 +1,167 @@
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+from dimension_index import DimensionIndex
+
+NO_DAY = np.iinfo(np.int64).min
+NO_ORDER = np.iinfo(np.int64).min
+
+
+def month_codes(dates: pd.Series) -> np.ndarray:
+    # Months since 1970-01 as integers (NaT -> NO_DAY)
+    return dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+
+
+def day_codes(dates: pd.Series) -> np.ndarray:
+    return dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+class CohortEngine:
+    """Signup-month cohorts and repeat-purchase intervals, fed one chunk of sales at a time.
+
+    Per customer it keeps a bitmask of active months since signup plus a few integer counters,
+    so memory is O(customers) no matter how many orders are streamed. Everything is computed
+    on integer month/day codes with sorted arrays, np.diff and ufunc.at; there is no
+    per-customer Python loop. Intervals between orders that fall in different chunks are only
+    correct if chunks arrive in order_date order (e.g. an order log read with chunksize).
+    """
+
+    def __init__(self, customers: pd.DataFrame):
+        self.dimension = DimensionIndex(customers, "customer_id")
+        signup = pd.to_datetime(self.dimension.table["signup_date"], errors="coerce")
+        self.has_signup = signup.notna().to_numpy()
+        self.signup_month = np.where(self.has_signup, month_codes(signup), 0)
+        self.signup_day = np.where(self.has_signup, day_codes(signup), NO_DAY)
+
+        n = len(self.dimension.table)
+        self.active = np.zeros((n, 1), dtype=np.uint64)  # bit m of word w: active in month 64*w + m
+        self.max_offset = -1
+        self.orders = np.zeros(n, dtype=np.int64)
+        self.first_day = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+        self.last_day = np.full(n, NO_DAY, dtype=np.int64)
+        self.last_order = np.full(n, NO_ORDER, dtype=np.int64)
+        self.interval_days = np.zeros(n, dtype=np.int64)
+        self.interval_histogram = np.zeros(0, dtype=np.int64)
+
+    def update(self, sales: pd.DataFrame) -> None:
+        pos = self.dimension.codes(sales["customer_id"])
+        valid = (pos >= 0) & sales["order_date"].notna().to_numpy() & sales["order_id"].notna().to_numpy()
+        dates = sales["order_date"][valid]
+        pos = pos[valid]
+        days = day_codes(dates)
+        months = month_codes(dates)
+        order_ids = sales["order_id"][valid].to_numpy(dtype=np.int64)
+        self._update_retention(pos, months)
+        self._update_intervals(pos, days, order_ids)
+
+    def _update_retention(self, pos: np.ndarray, months: np.ndarray) -> None:
+        offset = months - self.signup_month[pos]
+        keep = self.has_signup[pos] & (offset >= 0)
+        pos, offset = pos[keep], offset[keep]
+        if not len(pos):
+            return
+        self.max_offset = max(self.max_offset, int(offset.max()))
+        words = self.max_offset // 64 + 1
+        if words > self.active.shape[1]:
+            self.active = np.pad(self.active, ((0, 0), (0, words - self.active.shape[1])))
+        bits = np.left_shift(np.uint64(1), (offset % 64).astype(np.uint64))
+        np.bitwise_or.at(self.active, (pos, offset // 64), bits)
+
+    def _update_intervals(self, pos: np.ndarray, days: np.ndarray, order_ids: np.ndarray) -> None:
+        # One row per (customer, order): lines of an order share its date
+        order = np.lexsort((order_ids, days, pos))
+        pos, days, order_ids = pos[order], days[order], order_ids[order]
+        new = np.ones(len(pos), dtype=bool)
+        new[1:] = (pos[1:] != pos[:-1]) | (order_ids[1:] != order_ids[:-1])
+        # An order cut by the previous chunk boundary is not a new order
+        new &= self.last_order[pos] != order_ids
+        pos, days, order_ids = pos[new], days[new], order_ids[new]
+        if not len(pos):
+            return
+
+        run_start = np.ones(len(pos), dtype=bool)
+        run_start[1:] = pos[1:] != pos[:-1]
+        run_end = np.ones(len(pos), dtype=bool)
+        run_end[:-1] = run_start[1:]
+
+        # Gap to the previous order: within the chunk by np.diff, across chunks from last_day
+        previous = np.empty(len(pos), dtype=np.int64)
+        previous[1:] = days[:-1]
+        previous[run_start] = self.last_day[pos[run_start]]
+        has_previous = previous != NO_DAY
+        intervals = days[has_previous] - previous[has_previous]
+
+        np.add.at(self.orders, pos, 1)
+        np.add.at(self.interval_days, pos[has_previous], intervals)
+        np.minimum.at(self.first_day, pos, days)
+        self.last_day[pos[run_end]] = days[run_end]
+        self.last_order[pos[run_end]] = order_ids[run_end]
+
+        counts = np.bincount(np.maximum(intervals, 0))
+        if len(counts) > len(self.interval_histogram):
+            self.interval_histogram = np.pad(self.interval_histogram, (0, len(counts) - len(self.interval_histogram)))
+        self.interval_histogram[: len(counts)] += counts
+
+    def retention(self) -> pd.DataFrame:
+        # Active customers per signup month (rows) and months since signup (columns)
+        cohorts, cohort_codes = np.unique(self.signup_month[self.has_signup], return_inverse=True)
+        active = self.active[self.has_signup]
+        counts = np.zeros((len(cohorts), self.max_offset + 1), dtype=np.int64)
+        for offset in range(self.max_offset + 1):
+            bit = (active[:, offset // 64] >> np.uint64(offset % 64)) & np.uint64(1)
+            counts[:, offset] = np.bincount(cohort_codes, weights=bit, minlength=len(cohorts))
+        return pd.DataFrame(
+            counts,
+            index=pd.Index(cohorts.astype("datetime64[M]").astype("datetime64[ns]"), name="signup_month"),
+            columns=pd.RangeIndex(self.max_offset + 1, name="months_since_signup"),
+        )
+
+    def retention_rates(self) -> pd.DataFrame:
+        # Share of each cohort active in each month since signup
+        sizes = pd.Series(self.signup_month[self.has_signup]).value_counts().sort_index()
+        retention = self.retention()
+        return retention.div(sizes.to_numpy(), axis=0)
+
+    def purchase_intervals(self) -> pd.DataFrame:
+        # One row per customer with at least one order
+        has_orders = self.orders > 0
+        orders = self.orders[has_orders]
+        first = self.first_day[has_orders]
+        signup = self.signup_day[has_orders]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_interval = np.where(orders > 1, self.interval_days[has_orders] / (orders - 1), np.nan)
+        return pd.DataFrame(
+            {
+                "customer_id": self.dimension.table["customer_id"].to_numpy()[has_orders],
+                "orders": orders,
+                "first_order": first.astype("datetime64[D]").astype("datetime64[ns]"),
+                "last_order": self.last_day[has_orders].astype("datetime64[D]").astype("datetime64[ns]"),
+                "days_to_first_order": np.where(signup != NO_DAY, first - signup, np.nan),
+                "mean_interval_days": mean_interval,
+            }
+        )
+
+    def repeat_rate(self) -> float:
+        # Share of ordering customers who ordered more than once
+        buyers = np.count_nonzero(self.orders)
+        return np.count_nonzero(self.orders > 1) / buyers if buyers else 0.0
+
+
+def cohort_analysis(customers: pd.DataFrame, sales_chunks: pd.DataFrame | Iterable[pd.DataFrame]) -> dict:
+    engine = CohortEngine(customers)
+    chunks = [sales_chunks] if isinstance(sales_chunks, pd.DataFrame) else sales_chunks
+    for chunk in chunks:
+        engine.update(chunk)
+    return cohort_summary(engine)
+
+
+def cohort_summary(engine: CohortEngine) -> dict:
+    return {
+        "retention": engine.retention(),
+        "retention_rates": engine.retention_rates(),
+        "purchase_intervals": engine.purchase_intervals(),
+        "interval_histogram": pd.Series(engine.interval_histogram, name="orders").rename_axis("days"),
+        "repeat_rate": engine.repeat_rate(),
+    }
@@ -1,19 +1,99 @@
-import itertools
+import argparse
+import math
 import os
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import seaborn as sns
 
-
-def load_data(customer_path="Week5/Project/customer_data.csv", sales_path="D:\InternshipDevArena\Week5\Project\sales_data.csv") -> tuple[pd.DataFrame, pd.DataFrame]:
+from aggregation_engine import FactorizedFrame
+from charts import render_charts
+from cohort_retention import CohortEngine, cohort_analysis, cohort_summary
+from dimension_index import DimensionIndex
+from heavy_hitters import top_k_indices
+from hyperloglog import DEFAULT_PRECISION, GroupedHyperLogLog, HyperLogLog
+from market_basket import co_purchase_pairs
+from report_writer import FORMATS as REPORT_FORMATS
+from report_writer import write_report
+from sales_database import SalesDatabase
+from task_graph import ResultCache, TaskGraph
+
+# Customer columns the aggregations read; region is resolved separately
+CUSTOMER_ATTRIBUTES = ["customer_name", "segment"]
+
+# Defaults are relative to this file, so the script runs from any working directory
+PROJECT_DIR = Path(__file__).resolve().parent
+CUSTOMER_PATH = PROJECT_DIR / "customer_data.csv"
+SALES_PATH = PROJECT_DIR / "sales_data.csv"
+OUTPUT_DIR = PROJECT_DIR / "outputs"
+CACHE_DIR = PROJECT_DIR / ".cache"
+
+
+def load_data(customer_path=CUSTOMER_PATH, sales_path=SALES_PATH) -> tuple[pd.DataFrame, pd.DataFrame]:
     customers = pd.read_csv(customer_path)
     sales = pd.read_csv(sales_path, parse_dates=["order_date"])
     return customers, sales
 
 
-def prepare_data(customers: pd.DataFrame, sales: pd.DataFrame) -> pd.DataFrame:
+def load_database(
+    path: str,
+    customer_path: str | Path = CUSTOMER_PATH,
+    sales_path: str | Path = SALES_PATH,
+    reimport: bool = False,
+) -> SalesDatabase:
+    # SQLite (or DuckDB for .duckdb files) backend: tables stay on disk and the aggregations
+    # run as SQL. The CSVs are imported when the file has no tables yet or `reimport` is set.
+    db = SalesDatabase(path)
+    if reimport or not db.has_tables():
+        db.import_csv(customer_path, sales_path)
+    return db
+
+
+def prepare_data(
+    customers: pd.DataFrame,
+    sales: pd.DataFrame,
+    join: str = "index",
+    dimension: DimensionIndex | None = None,
+) -> pd.DataFrame:
+    if join == "merge":
+        return prepare_data_merge(customers, sales)
+    if join != "index":
+        raise ValueError(f"Unknown join: {join}")
+
+    # Customers are indexed once by customer_id and only the attributes the aggregations use are
+    # taken onto the sales rows; pass the same `dimension` for every chunk of chunked sales.
+    dimension = dimension or DimensionIndex(customers, "customer_id")
+    codes = dimension.codes(sales["customer_id"])
+    prepared = dimension.attach(sales, [c for c in CUSTOMER_ATTRIBUTES if c in customers.columns], codes)
+
+    if "region" in customers.columns:
+        prepared["region"] = resolve_region(customers, sales, dimension, codes)
+
+    prepared["order_month"] = prepared["order_date"].dt.to_period("M").dt.to_timestamp()
+    return prepared
+
+
+def resolve_region(
+    customers: pd.DataFrame,
+    sales: pd.DataFrame,
+    dimension: DimensionIndex | None = None,
+    codes: np.ndarray | None = None,
+) -> pd.Series:
+    # Prefer the sales region if both exist; fall back to customer region if missing.
+    dimension = dimension or DimensionIndex(customers, "customer_id")
+    if codes is None:
+        codes = dimension.codes(sales["customer_id"])
+    customer_region = pd.Series(dimension.take("region", codes), index=sales.index)
+    if "region" in sales.columns:
+        return sales["region"].fillna(customer_region)
+    return customer_region
+
+
+def prepare_data_merge(customers: pd.DataFrame, sales: pd.DataFrame) -> pd.DataFrame:
+    # Full merge: every customer column lands on every sales row
     merged = sales.merge(
         customers,
         on="customer_id",
@@ -32,127 +112,452 @@ def prepare_data(customers: pd.DataFrame, sales: pd.DataFrame) -> pd.DataFrame:
     return merged
 
 
-def compute_aggregations(df: pd.DataFrame) -> dict:
+def compute_combo_counts(df: pd.DataFrame, top_k: int | None = None) -> pd.DataFrame:
+    # Co-purchase signal: product pairs within the same order, counted with a sparse
+    # order x product matrix product instead of exploding every pair per order
+    return co_purchase_pairs(df, top_k=top_k)
+
+
+class FPNode:
+    __slots__ = ("item", "count", "parent", "children")
+
+    def __init__(self, item: int | None, parent: "FPNode | None"):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+
+class FPTree:
+    # FP-growth tree over order baskets. Items are inserted in a fixed id order (first time a
+    # product is seen) rather than by global frequency, so the tree is built in a single pass
+    # over chunked input; infrequent items are pruned while mining instead.
+
+    def __init__(self):
+        self.root = FPNode(None, None)
+        self.header = {}
+        self.item_ids = {}
+        self.n_orders = 0
+
+    def insert(self, items: Iterable[int], count: int) -> None:
+        node = self.root
+        for item in items:
+            child = node.children.get(item)
+            if child is None:
+                child = FPNode(item, node)
+                node.children[item] = child
+                self.header.setdefault(item, []).append(child)
+            child.count += count
+            node = child
+
+    def add_orders(self, lines: pd.DataFrame) -> None:
+        # lines: order_id / product rows for complete orders
+        lines = lines[["order_id", "product"]].dropna().drop_duplicates()
+        if lines.empty:
+            return
+        for product in sorted(set(lines["product"].unique()) - self.item_ids.keys()):
+            self.item_ids[product] = len(self.item_ids)
+
+        order_codes, orders = pd.factorize(lines["order_id"])
+        item_codes = lines["product"].map(self.item_ids).to_numpy(dtype=np.int64)
+        order = np.lexsort((item_codes, order_codes))
+        order_codes, item_codes = order_codes[order], item_codes[order]
+        bounds = np.flatnonzero(np.diff(order_codes)) + 1
+
+        # Identical baskets are inserted once with their multiplicity
+        baskets = Counter(tuple(basket) for basket in np.split(item_codes, bounds))
+        for basket, count in baskets.items():
+            self.insert(basket, count)
+        self.n_orders += len(orders)
+
+    def mine(self, min_count: int, max_len: int | None = None) -> list[tuple[tuple[int, ...], int]]:
+        results = []
+        _mine_tree(self, (), min_count, max_len, results)
+        return results
+
+
+def _mine_tree(tree: FPTree, prefix: tuple, min_count: int, max_len: int | None, results: list) -> None:
+    for item, nodes in tree.header.items():
+        support = sum(node.count for node in nodes)
+        if support < min_count:
+            continue
+        itemset = prefix + (item,)
+        results.append((itemset, support))
+        if max_len is not None and len(itemset) >= max_len:
+            continue
+
+        # Conditional pattern base: the path above every node holding this item
+        paths = []
+        path_counts = Counter()
+        for node in nodes:
+            path = []
+            parent = node.parent
+            while parent.item is not None:
+                path.append(parent.item)
+                parent = parent.parent
+            if path:
+                paths.append((path, node.count))
+                for path_item in path:
+                    path_counts[path_item] += node.count
+
+        frequent = {path_item for path_item, count in path_counts.items() if count >= min_count}
+        if not frequent:
+            continue
+        conditional = FPTree()
+        for path, count in paths:
+            items = [path_item for path_item in reversed(path) if path_item in frequent]
+            if items:
+                conditional.insert(items, count)
+        _mine_tree(conditional, itemset, min_count, max_len, results)
+
+
+def frequent_itemsets(
+    lines: pd.DataFrame | Iterable[pd.DataFrame],
+    min_support: float = 0.01,
+    max_len: int | None = None,
+    min_len: int = 1,
+) -> pd.DataFrame:
+    # lines: a frame of order lines, or an iterable of chunks (e.g. read_csv(chunksize=...)).
+    # Lines of one order must be contiguous; an order cut by a chunk boundary is carried over.
+    chunks = [lines] if isinstance(lines, pd.DataFrame) else lines
+    tree = FPTree()
+    pending = None
+    for chunk in chunks:
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        last_order = chunk["order_id"].iloc[-1]
+        is_last = (chunk["order_id"] == last_order).to_numpy()
+        pending = chunk[is_last]
+        tree.add_orders(chunk[~is_last])
+    if pending is not None:
+        tree.add_orders(pending)
+
+    min_count = max(1, math.ceil(min_support * tree.n_orders))
+    names = np.array(sorted(tree.item_ids, key=tree.item_ids.get), dtype=object)
+    rows = [
+        (tuple(sorted(names[list(itemset)])), len(itemset), count)
+        for itemset, count in tree.mine(min_count, max_len)
+        if len(itemset) >= min_len
+    ]
+    itemsets = pd.DataFrame(rows, columns=["itemset", "size", "count"])
+    itemsets["support"] = itemsets["count"] / max(tree.n_orders, 1)
+    return itemsets.sort_values(["size", "count"], ascending=[False, False], ignore_index=True)
+
+
+def compute_aggregations(df: pd.DataFrame | SalesDatabase, engine: str = "factorized", top_k: int | None = None) -> dict:
+    # top_k keeps only the k best customers instead of sorting every customer
+    if isinstance(df, SalesDatabase):
+        return df.aggregations(top_k=top_k)
+    if engine == "factorized":
+        return compute_aggregations_factorized(df, top_k=top_k)
+    if engine != "pandas":
+        raise ValueError(f"Unknown aggregation engine: {engine}")
+
     top_customers = (
-        df.groupby(["customer_id", "customer_name"], as_index=False)["revenue"]
+        df.groupby(["customer_id", "customer_name"], as_index=False, observed=True)["revenue"]
         .sum()
         .sort_values("revenue", ascending=False)
     )
+    if top_k is not None:
+        top_customers = top_customers.head(top_k)
 
     product_perf = (
-        df.groupby("product", as_index=False)
+        df.groupby("product", as_index=False, observed=True)
         .agg(total_revenue=("revenue", "sum"), units_sold=("quantity", "sum"), avg_price=("unit_price", "mean"))
         .sort_values("total_revenue", ascending=False)
     )
 
-    region_summary = df.groupby("region", as_index=False)["revenue"].sum().sort_values("revenue", ascending=False)
+    region_summary = df.groupby("region", as_index=False, observed=True)["revenue"].sum().sort_values("revenue", ascending=False)
 
     monthly_trend = (
-        df.groupby("order_month", as_index=False)
+        df.groupby("order_month", as_index=False, observed=True)
         .agg(monthly_revenue=("revenue", "sum"), orders=("order_id", "nunique"))
         .sort_values("order_month")
     )
 
-    # Co-purchase signal: combos of products within the same order (may be sparse in sample data)
-    combos = (
-        df.groupby("order_id")["product"]
-        .apply(lambda x: list(itertools.combinations(sorted(set(x)), 2)))
-        .explode()
-        .dropna()
+    combo_counts = compute_combo_counts(df)
+
+    pivot_region_product = pd.pivot_table(
+        df, values="revenue", index="region", columns="product", aggfunc="sum", fill_value=0, observed=True
     )
 
-    if combos.empty:
-        combo_counts = pd.DataFrame(columns=["product_a", "product_b", "count"])
+    return {
+        "top_customers": top_customers,
+        "product_perf": product_perf,
+        "region_summary": region_summary,
+        "monthly_trend": monthly_trend,
+        "combo_counts": combo_counts,
+        "pivot_region_product": pivot_region_product,
+    }
+
+
+def compute_aggregations_factorized(df: pd.DataFrame, top_k: int | None = None) -> dict:
+    # Same outputs as the pandas engine, but each key column is factorized once and every
+    # sum / mean / nunique is a bincount over the shared integer codes.
+    frame = FactorizedFrame(df)
+
+    customer_keys = ["customer_id", "customer_name"]
+    customer_revenue = frame.sum(customer_keys, "revenue")
+    if top_k is None:
+        top_customers = frame.groups(customer_keys)[1].assign(revenue=customer_revenue)
+        top_customers = top_customers.sort_values("revenue", ascending=False)
     else:
-        combo_counts = combos.value_counts().reset_index(name="count").rename(columns={"index": "pair"})
-        combo_counts[["product_a", "product_b"]] = pd.DataFrame(combo_counts["pair"].tolist(), index=combo_counts.index)
-        combo_counts = combo_counts.drop(columns="pair")
+        # Partial selection on the revenue array; only k customer rows are materialized
+        top = top_k_indices(customer_revenue, top_k)
+        top_customers = frame.groups(customer_keys)[1].iloc[top].assign(revenue=customer_revenue[top])
+
+    product_perf = frame.groups(["product"])[1].assign(
+        total_revenue=frame.sum(["product"], "revenue"),
+        units_sold=frame.sum(["product"], "quantity"),
+        avg_price=frame.mean(["product"], "unit_price"),
+    )
+    product_perf = product_perf.sort_values("total_revenue", ascending=False)
 
-    pivot_region_product = pd.pivot_table(
-        df, values="revenue", index="region", columns="product", aggfunc="sum", fill_value=0
+    region_summary = frame.groups(["region"])[1].assign(revenue=frame.sum(["region"], "revenue"))
+    region_summary = region_summary.sort_values("revenue", ascending=False)
+
+    monthly_trend = frame.groups(["order_month"])[1].assign(
+        monthly_revenue=frame.sum(["order_month"], "revenue"),
+        orders=frame.nunique(["order_month"], "order_id"),
     )
+    monthly_trend = monthly_trend.sort_values("order_month")
+
+    return {
+        "top_customers": top_customers,
+        "product_perf": product_perf,
+        "region_summary": region_summary,
+        "monthly_trend": monthly_trend,
+        "combo_counts": compute_combo_counts(df),
+        "pivot_region_product": frame.pivot_sum("region", "product", "revenue"),
+    }
+
+
+# Group keys of each additive partial state (see partial_state / combine_partials)
+PARTIAL_KEYS = {
+    "customers": ["customer_id", "customer_name"],
+    "products": ["product"],
+    "regions": ["region"],
+    "months": ["order_month"],
+    "cells": ["region", "product"],
+}
+
+
+def partial_state(df: pd.DataFrame) -> dict:
+    # Sums and counts per group of prepared sales rows; states of shards or chunks merge by
+    # concatenation and a grouped sum, and means travel as (sum, count)
+    frame = FactorizedFrame(df)
+    customer_keys = ["customer_id", "customer_name"]
+    return {
+        "customers": frame.groups(customer_keys)[1].assign(revenue=frame.sum(customer_keys, "revenue")),
+        "products": frame.groups(["product"])[1].assign(
+            total_revenue=frame.sum(["product"], "revenue"),
+            units_sold=frame.sum(["product"], "quantity"),
+            price_sum=frame.sum(["product"], "unit_price"),
+            price_count=frame.count(["product"], "unit_price"),
+        ),
+        "regions": frame.groups(["region"])[1].assign(revenue=frame.sum(["region"], "revenue")),
+        "months": frame.groups(["order_month"])[1].assign(monthly_revenue=frame.sum(["order_month"], "revenue")),
+        "cells": df.groupby(["region", "product"], observed=True)["revenue"].sum().reset_index(),
+    }
+
+
+def combine_partials(partials: list[dict]) -> dict:
+    return {
+        name: pd.concat([partial[name] for partial in partials], ignore_index=True)
+        .groupby(keys, as_index=False, observed=True)
+        .sum()
+        for name, keys in PARTIAL_KEYS.items()
+    }
+
+
+def aggregate_shard(customers: pd.DataFrame, sales: pd.DataFrame) -> dict:
+    # Partial state for one shard; distinct orders travel as the shard's distinct (month, order) pairs
+    df = prepare_data(customers, sales)
+    return {**partial_state(df), "month_orders": df[["order_month", "order_id"]].dropna().drop_duplicates()}
+
+
+def merge_shards(partials: list[dict], top_k: int | None = None, monthly_orders: pd.Series | None = None) -> dict:
+    # Recombine partial states into the same frames compute_aggregations returns (without
+    # combos). Distinct orders per month are counted from the shards' (month, order) pairs
+    # unless given as `monthly_orders` (e.g. sketch estimates of a chunked run).
+    state = combine_partials(partials)
+    top_customers = state["customers"].sort_values("revenue", ascending=False)
+    if top_k is not None:
+        top_customers = top_customers.head(top_k)
+
+    products = state["products"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_price = products["price_sum"] / products["price_count"].where(products["price_count"] > 0)
+    product_perf = products[["product", "total_revenue", "units_sold"]].assign(avg_price=avg_price)
+    product_perf = product_perf.sort_values("total_revenue", ascending=False)
+
+    region_summary = state["regions"].sort_values("revenue", ascending=False)
+
+    if monthly_orders is None:
+        month_orders = pd.concat([partial["month_orders"] for partial in partials], ignore_index=True).drop_duplicates()
+        monthly_orders = month_orders.groupby("order_month").size()
+    monthly_trend = state["months"]
+    monthly_trend["orders"] = monthly_trend["order_month"].map(monthly_orders).fillna(0).astype(np.int64)
+    monthly_trend = monthly_trend.sort_values("order_month")
+
+    pivot_region_product = state["cells"].pivot(index="region", columns="product", values="revenue").fillna(0.0)
 
     return {
         "top_customers": top_customers,
         "product_perf": product_perf,
         "region_summary": region_summary,
         "monthly_trend": monthly_trend,
-        "combo_counts": combo_counts,
         "pivot_region_product": pivot_region_product,
     }
 
 
-def compute_kpis(df: pd.DataFrame, customers: pd.DataFrame) -> dict:
-    total_revenue = df["revenue"].sum()
-    total_customers = customers["customer_id"].nunique()
-    avg_order_value = df["revenue"].mean()
-    top_customer_row = (
-        df.groupby(["customer_id", "customer_name"])["revenue"].sum().sort_values(ascending=False).reset_index().head(1)
+def compute_aggregations_sharded(
+    customers: pd.DataFrame,
+    sales: pd.DataFrame,
+    shard_by: str = "region",
+    workers: int | None = None,
+    top_k: int | None = None,
+) -> dict:
+    # prepare_data + aggregation per shard in a process pool; co-purchase pairs need whole
+    # orders, which may span shards, so they are counted on the order lines in parallel.
+    if shard_by != "region":
+        raise ValueError(f"Unknown shard key: {shard_by}")
+    shard_codes, _ = pd.factorize(resolve_region(customers, sales), use_na_sentinel=False)
+    shards = [sales[shard_codes == code] for code in range(shard_codes.max() + 1)] if len(sales) else [sales]
+
+    with ProcessPoolExecutor(max_workers=min(len(shards) + 1, workers or os.cpu_count() or 1)) as pool:
+        combos = pool.submit(compute_combo_counts, sales[["order_id", "product"]])
+        partials = list(pool.map(aggregate_shard, [customers] * len(shards), shards))
+        aggs = merge_shards(partials, top_k=top_k)
+        aggs["combo_counts"] = combos.result()
+    return aggs
+
+
+class DistinctCounts:
+    # Mergeable distinct counts for chunked or partitioned input: customers overall and orders
+    # per month, each a HyperLogLog (~1.6% standard error, 4 KB per sketch at the default
+    # precision; see hyperloglog.py). Shards can be merged in any order.
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        self.customers = HyperLogLog(precision)
+        self.orders_by_month = GroupedHyperLogLog(precision)
+
+    def add_customers(self, customers: pd.DataFrame) -> None:
+        self.customers.update(customers["customer_id"])
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        # chunk: prepared sales rows (see prepare_data)
+        self.orders_by_month.update(chunk["order_month"], chunk["order_id"])
+
+    def merge(self, other: "DistinctCounts") -> "DistinctCounts":
+        self.customers.merge(other.customers)
+        self.orders_by_month.merge(other.orders_by_month)
+        return self
+
+    def monthly_orders(self) -> pd.Series:
+        # Estimated distinct orders per order_month
+        return self.orders_by_month.estimate().round().astype(np.int64).rename_axis("order_month")
+
+
+def analyze_chunked(
+    customers: pd.DataFrame,
+    sales_chunks: Iterable[pd.DataFrame],
+    precision: int = DEFAULT_PRECISION,
+) -> tuple[dict, dict]:
+    # Aggregations and KPIs of a sales file read chunk by chunk. Sums are folded into one
+    # running partial state, distinct counts (customers, orders per month) are HyperLogLog
+    # estimates, and only the (order_id, product) lines are kept for the basket statistics.
+    # Purchase intervals across chunks assume the file is in order_date order.
+    dimension = DimensionIndex(customers, "customer_id")
+    distinct = DistinctCounts(precision)
+    distinct.add_customers(customers)
+    cohorts = CohortEngine(customers)
+    state, order_lines = None, []
+    revenue_sum, revenue_count = 0.0, 0
+    for chunk in sales_chunks:
+        df = prepare_data(customers, chunk, dimension=dimension)
+        partial = partial_state(df)
+        state = partial if state is None else combine_partials([state, partial])
+        distinct.update(df)
+        cohorts.update(chunk)
+        order_lines.append(chunk[["order_id", "product"]])
+        revenue_sum += df["revenue"].sum()
+        revenue_count += df["revenue"].count()
+
+    if state is None:
+        raise ValueError("No sales rows to analyze")
+    aggs = merge_shards([state], monthly_orders=distinct.monthly_orders())
+    lines = pd.concat(order_lines, ignore_index=True)
+    aggs["combo_counts"] = compute_combo_counts(lines)
+    aggs["frequent_itemsets"] = frequent_itemsets(lines, min_support=0.01, max_len=4, min_len=2)
+    aggs["cohorts"] = cohort_summary(cohorts)
+    kpis = summarize_kpis(
+        total_revenue=revenue_sum,
+        total_customers=round(distinct.customers.estimate()),
+        avg_order_value=revenue_sum / revenue_count if revenue_count else np.nan,
+        top_customers=aggs["top_customers"],
     )
-    top_customer_name = top_customer_row.at[0, "customer_name"]
-    top_customer_value = top_customer_row.at[0, "revenue"]
+    return aggs, kpis
+
 
+def summarize_kpis(total_revenue: float, total_customers: int, avg_order_value: float, top_customers: pd.DataFrame) -> dict:
+    top_customer_row = top_customers.head(1).reset_index(drop=True)
     return {
         "total_revenue": total_revenue,
         "total_customers": total_customers,
         "avg_order_value": avg_order_value,
-        "top_customer_name": top_customer_name,
-        "top_customer_value": top_customer_value,
+        "top_customer_name": top_customer_row.at[0, "customer_name"],
+        "top_customer_value": top_customer_row.at[0, "revenue"],
     }
 
 
-def ensure_output_dir(path="outputs") -> Path:
+def compute_kpis(df: pd.DataFrame | SalesDatabase, customers: pd.DataFrame | None, aggs: dict | None = None) -> dict:
+    if isinstance(df, SalesDatabase):
+        return df.kpis(aggs)
+    if aggs is not None:
+        # Reuse the customer totals from compute_aggregations instead of grouping again
+        top_customers = aggs["top_customers"]
+    else:
+        top_customers = (
+            df.groupby(["customer_id", "customer_name"])["revenue"].sum().sort_values(ascending=False).reset_index()
+        )
+    return summarize_kpis(
+        total_revenue=df["revenue"].sum(),
+        total_customers=customers["customer_id"].nunique(),
+        avg_order_value=df["revenue"].mean(),
+        top_customers=top_customers,
+    )
+
+
+def ensure_output_dir(path=OUTPUT_DIR) -> Path:
     output_dir = Path(path)
     output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir
 
 
-def create_visuals(df: pd.DataFrame, aggs: dict, output_dir: Path) -> None:
-    sns.set_theme(style="whitegrid")
-
-    # Bar chart: top customers by revenue
-    plt.figure(figsize=(8, 5))
-    sns.barplot(data=aggs["top_customers"].head(10), x="revenue", y="customer_name", hue="customer_name", palette="Blues_d", legend=False)
-    plt.title("Top Customers by Revenue")
-    plt.xlabel("Revenue")
-    plt.ylabel("Customer")
-    plt.tight_layout()
-    plt.savefig(output_dir / "top_customers.png", dpi=150)
-    plt.close()
-
-    # Line: monthly revenue trend
-    plt.figure(figsize=(8, 4))
-    sns.lineplot(data=aggs["monthly_trend"], x="order_month", y="monthly_revenue", marker="o", color="#2a9d8f")
-    plt.title("Monthly Revenue Trend")
-    plt.xlabel("Month")
-    plt.ylabel("Revenue")
-    plt.tight_layout()
-    plt.savefig(output_dir / "monthly_revenue_trend.png", dpi=150)
-    plt.close()
-
-    # Heatmap: revenue by region and product
-    plt.figure(figsize=(8, 5))
-    sns.heatmap(aggs["pivot_region_product"], annot=True, fmt=".1f", cmap="YlGnBu")
-    plt.title("Revenue by Region and Product")
-    plt.xlabel("Product")
-    plt.ylabel("Region")
-    plt.tight_layout()
-    plt.savefig(output_dir / "region_product_heatmap.png", dpi=150)
-    plt.close()
-
-    # Bar: product performance by revenue
-    plt.figure(figsize=(8, 5))
-    sns.barplot(data=aggs["product_perf"], x="product", y="total_revenue", hue="product", palette="crest", legend=False)
-    plt.title("Product Revenue")
-    plt.xlabel("Product")
-    plt.ylabel("Revenue")
-    plt.xticks(rotation=30, ha="right")
-    plt.tight_layout()
-    plt.savefig(output_dir / "product_revenue.png", dpi=150)
-    plt.close()
-
-
-def print_report(kpis: dict, aggs: dict) -> None:
+def create_visuals(df: pd.DataFrame | None, aggs: dict, output_dir: Path, workers: int | None = None) -> list[Path]:
+    # Charts render in parallel; a PNG whose source aggregate is unchanged since its last
+    # render is kept as is
+    paths, _ = render_charts(aggs, output_dir, workers=workers)
+    return paths
+
+
+def render_visuals(aggs: dict, output_dir: str) -> list[str]:
+    # Pipeline node: the charts only depend on the aggregations
+    return [str(path) for path in create_visuals(None, aggs, Path(output_dir))]
+
+
+def print_preview(title: str, frame: pd.DataFrame, rows: int, index: bool = False) -> None:
+    # Only the first rows are formatted; the full tables are in the written report
+    print(f"\n{title}:")
+    print(frame.head(rows).to_string(index=index))
+    if len(frame) > rows:
+        print(f"... {len(frame) - rows:,} more rows")
+
+
+def print_report(kpis: dict, aggs: dict, preview_rows: int = 10) -> None:
     print("CUSTOMER SALES ANALYSIS REPORT")
     print(f"Total Revenue: ${kpis['total_revenue']:,.2f}")
     print(f"Total Customers: {kpis['total_customers']:,}")
@@ -160,29 +565,169 @@ def print_report(kpis: dict, aggs: dict) -> None:
     print(f"Top Customer: {kpis['top_customer_name']} - ${kpis['top_customer_value']:,.2f}")
     print("\nTop 5 Customers:")
     print(aggs["top_customers"].head(5).to_string(index=False))
-    print("\nProduct Performance:")
-    print(aggs["product_perf"].to_string(index=False))
-    print("\nRevenue by Region:")
-    print(aggs["region_summary"].to_string(index=False))
+    print_preview("Product Performance", aggs["product_perf"], preview_rows)
+    print_preview("Revenue by Region", aggs["region_summary"], preview_rows)
     if not aggs["combo_counts"].empty:
         print("\nFrequently Bought Together (top 5 combos):")
         print(aggs["combo_counts"].head(5).to_string(index=False))
     else:
         print("\nFrequently Bought Together: insufficient multi-product orders to analyze.")
-
-
-def main() -> None:
-    customers, sales = load_data()
-    merged = prepare_data(customers, sales)
-    aggs = compute_aggregations(merged)
-    kpis = compute_kpis(merged, customers)
-
-    output_dir = ensure_output_dir()
-    create_visuals(merged, aggs, output_dir)
-    print_report(kpis, aggs)
+    larger_sets = aggs.get("frequent_itemsets", pd.DataFrame(columns=["size"]))
+    larger_sets = larger_sets[larger_sets["size"] >= 3]
+    if not larger_sets.empty:
+        print("\nFrequent Itemsets of 3+ Products (top 5):")
+        print(larger_sets.head(5).to_string(index=False))
+    if "cohorts" in aggs:
+        cohorts = aggs["cohorts"]
+        intervals = cohorts["purchase_intervals"]
+        print(f"\nRepeat Purchase Rate: {cohorts['repeat_rate']:.1%}")
+        print(f"Average Days Between Orders: {intervals['mean_interval_days'].mean():,.1f}")
+        rates = cohorts["retention_rates"]
+        rates = rates.loc[:, (rates > 0).any()].iloc[:, :6]
+        if not rates.empty:
+            rates = rates.rename(index=lambda month: month.strftime("%Y-%m")).round(2)
+            print_preview(
+                "Cohort Retention (share of signup cohort active, by months since signup)", rates, preview_rows, index=True
+            )
+
+
+def build_pipeline(
+    customer_path: str,
+    sales_path: str,
+    output_dir: Path,
+    cache: ResultCache | None = None,
+    shard_by: str | None = None,
+    workers: int | None = None,
+) -> TaskGraph:
+    # Raw and merged frames are only memoized in memory; everything downstream is also
+    # persisted, so unchanged CSVs skip straight to the cached results.
+    graph = TaskGraph(cache, source_dir=PROJECT_DIR)
+    graph.source("customer_file", str(customer_path))
+    graph.source("sales_file", str(sales_path))
+    graph.add("customers", pd.read_csv, ["customer_file"], persist=False)
+    graph.add("sales", pd.read_csv, ["sales_file"], persist=False, parse_dates=["order_date"])
+    if shard_by is not None:
+        graph.add("aggs", compute_aggregations_sharded, ["customers", "sales"], shard_by=shard_by, workers=workers)
+    else:
+        graph.add("merged", prepare_data, ["customers", "sales"], persist=False)
+        graph.add("aggs", compute_aggregations, ["merged"])
+    # Revenue totals and order lines come straight from the sales rows (prepare_data keeps them)
+    graph.add("frequent_itemsets", frequent_itemsets, ["sales"], min_support=0.01, max_len=4, min_len=2)
+    graph.add("kpis", compute_kpis, ["sales", "customers", "aggs"])
+    graph.add("cohorts", cohort_analysis, ["customers", "sales"])
+    graph.add(
+        "visuals",
+        render_visuals,
+        ["aggs"],
+        check=lambda paths: all(os.path.exists(path) for path in paths),
+        output_dir=str(output_dir.resolve()),
+    )
+    return graph
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Customer sales analysis report")
+    parser.add_argument("--customers", help=f"customer CSV (default: {CUSTOMER_PATH.name})")
+    parser.add_argument("--sales", help=f"sales CSV (default: {SALES_PATH.name})")
+    parser.add_argument("--output-dir", default=str(OUTPUT_DIR), help="where charts are written")
+    parser.add_argument(
+        "--database",
+        help="run the aggregations as SQL inside this SQLite/DuckDB file instead; the CSVs are imported "
+        "when it has no tables yet or --customers/--sales is given. Results are not cached and "
+        "--shard-by/--no-cache/--cache-dir do not apply",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=["region"],
+        help="split sales by this key and aggregate the shards in parallel processes",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help="read the sales CSV this many rows at a time; distinct customer and order counts become "
+        "HyperLogLog estimates and purchase intervals assume the file is sorted by order_date",
+    )
+    parser.add_argument("--workers", type=int, help="process pool size (default: all cores)")
+    parser.add_argument("--report-dir", help="where report tables are written (default: <output-dir>/report)")
+    parser.add_argument(
+        "--report-format",
+        nargs="+",
+        choices=list(REPORT_FORMATS),
+        default=list(REPORT_FORMATS),
+        help="table formats for the written report",
+    )
+    parser.add_argument("--preview-rows", type=int, default=10, help="rows per table printed to the console")
+    parser.add_argument("--cache-dir", help=f"stage result cache (default: {CACHE_DIR.name} next to this script)")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    args = parser.parse_args(argv)
+
+    # --customers/--sales with --database means (re)import them
+    args.reimport = args.customers is not None or args.sales is not None
+    args.customers = args.customers or str(CUSTOMER_PATH)
+    args.sales = args.sales or str(SALES_PATH)
+    if args.chunksize is not None and args.chunksize <= 0:
+        parser.error("--chunksize must be a positive number of rows")
+    if args.chunksize is not None:
+        ignored = [
+            flag
+            for flag, value in (
+                ("--database", args.database),
+                ("--shard-by", args.shard_by),
+                ("--no-cache", args.no_cache),
+                ("--cache-dir", args.cache_dir),
+            )
+            if value
+        ]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be combined with --chunksize (chunked results are not cached or sharded)")
+    if args.database is not None:
+        ignored = [
+            flag
+            for flag, value in (("--shard-by", args.shard_by), ("--no-cache", args.no_cache), ("--cache-dir", args.cache_dir))
+            if value
+        ]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be combined with --database (SQL results are not cached or sharded)")
+    if args.database is None or args.reimport or not Path(args.database).exists():
+        missing = [path for path in (args.customers, args.sales) if not Path(path).is_file()]
+        if missing:
+            parser.error(f"CSV not found: {', '.join(missing)}")
+    args.cache_dir = args.cache_dir or str(CACHE_DIR)
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    output_dir = ensure_output_dir(args.output_dir)
+    if args.database is not None:
+        # Out-of-core: aggregations are pushed down to the database
+        db = load_database(args.database, args.customers, args.sales, reimport=args.reimport)
+        aggs = compute_aggregations(db)
+        aggs["frequent_itemsets"] = frequent_itemsets(db.order_lines(), min_support=0.01, max_len=4, min_len=2)
+        aggs["cohorts"] = cohort_analysis(db.customers(), db.cohort_lines())
+        kpis = compute_kpis(db, None, aggs)
+        create_visuals(None, aggs, output_dir, workers=args.workers)
+        db.close()
+    elif args.chunksize is not None:
+        # Out-of-core: one pass over the sales CSV with bounded memory
+        customers = pd.read_csv(args.customers)
+        chunks = pd.read_csv(args.sales, parse_dates=["order_date"], chunksize=args.chunksize)
+        aggs, kpis = analyze_chunked(customers, chunks)
+        create_visuals(None, aggs, output_dir, workers=args.workers)
+    else:
+        cache = None if args.no_cache else ResultCache(args.cache_dir)
+        graph = build_pipeline(args.customers, args.sales, output_dir, cache, args.shard_by, args.workers)
+        aggs = {**graph.get("aggs"), "frequent_itemsets": graph.get("frequent_itemsets"), "cohorts": graph.get("cohorts")}
+        kpis = graph.get("kpis")
+        graph.get("visuals")
+        print(f"Stages computed: {', '.join(graph.computed) or 'none (all cached)'}\n")
+
+    report_dir = Path(args.report_dir) if args.report_dir else output_dir / "report"
+    write_report(kpis, aggs, report_dir, formats=tuple(args.report_format))
+    print_report(kpis, aggs, preview_rows=args.preview_rows)
     print(f"\nVisualizations saved to: {output_dir.resolve()}")
+    print(f"Report tables saved to: {report_dir.resolve()}")
 
 
 if __name__ == "__main__":
     main()
-
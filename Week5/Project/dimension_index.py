@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+
+class DimensionIndex:
+    """Dimension table indexed once by its key, for joining fact rows by array take.
+
+    Unlike DataFrame.merge this never copies the whole dimension onto every fact row: rows are
+    mapped to integer positions once, and only the attributes that are asked for are taken.
+    The same index can be reused for every chunk of a chunked fact table (broadcast join).
+    """
+
+    def __init__(self, table: pd.DataFrame, key: str):
+        self.key = key
+        self.table = table.reset_index(drop=True)
+        self.index = pd.Index(self.table[key])
+        if not self.index.is_unique:
+            # Same failure as merge(validate="many_to_one")
+            raise pd.errors.MergeError("Merge keys are not unique in right dataset; not a many-to-one merge")
+
+    def codes(self, keys: pd.Series) -> np.ndarray:
+        # Row position of each key in the dimension table, -1 where it is missing
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            key_codes, uniques = keys.cat.codes.to_numpy(), keys.cat.categories
+        else:
+            key_codes, uniques = pd.factorize(keys)
+        # Look up each distinct key once instead of every row; the trailing -1 maps missing keys
+        lookup = np.append(self.index.get_indexer(uniques), -1)
+        return lookup[key_codes]
+
+    def take(self, column: str, codes: np.ndarray):
+        return self.table[column].array.take(codes, allow_fill=True)
+
+    def attach(self, facts: pd.DataFrame, columns: list[str], codes: np.ndarray | None = None) -> pd.DataFrame:
+        if codes is None:
+            codes = self.codes(facts[self.key])
+        return facts.assign(**{column: self.take(column, codes) for column in columns})
@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    # Positions of the k largest values, largest first; ties keep the lower position first.
+    # argpartition is O(n), only the k winners are sorted.
+    values = np.asarray(values)
+    if k >= len(values):
+        candidates = np.arange(len(values))
+    else:
+        candidates = np.argpartition(-values, k - 1)[:k]
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters sketch over weighted keys, fed one chunk at a time.
+
+    At most `capacity` keys are monitored. Every estimate over-counts the true total by at
+    most its `error`, and error <= epsilon * total weight seen, with capacity = ceil(1 / epsilon).
+    Each chunk is pre-aggregated and merged into the sketch as an exact summary, so updates
+    are vectorized rather than per row.
+    """
+
+    def __init__(self, capacity: int | None = None, epsilon: float | None = None):
+        if capacity is None:
+            if epsilon is None:
+                raise ValueError("Pass capacity or epsilon")
+            capacity = math.ceil(1 / epsilon)
+        self.capacity = capacity
+        self.total = 0.0
+        self.counts = None
+        self.errors = None
+
+    @property
+    def epsilon(self) -> float:
+        return 1 / self.capacity
+
+    def update(self, keys: pd.Series | pd.DataFrame, weights: pd.Series) -> None:
+        # Weights must be non-negative; missing weights count as 0 and missing keys are skipped
+        names = list(keys.columns) if isinstance(keys, pd.DataFrame) else [keys.name]
+        frame = pd.concat([keys, weights.fillna(0).rename("_weight")], axis=1)
+        chunk = frame.groupby(names, sort=False)["_weight"].sum()
+        self.total += float(chunk.sum())
+        if self.counts is None:
+            self.counts = chunk.iloc[:0].astype(np.float64)
+            self.errors = self.counts.copy()
+
+        # Keys not monitored yet may already have been seen up to the current minimum
+        full = len(self.counts) >= self.capacity
+        floor = float(self.counts.min()) if full else 0.0
+        keys_union = self.counts.index.union(chunk.index)
+        counts = self.counts.reindex(keys_union, fill_value=floor) + chunk.reindex(keys_union, fill_value=0.0)
+        errors = self.errors.reindex(keys_union, fill_value=floor)
+        if len(counts) > self.capacity:
+            keep = counts.nlargest(self.capacity, keep="first").index
+            counts, errors = counts.loc[keep], errors.loc[keep]
+        self.counts, self.errors = counts, errors
+
+    def top(self, k: int, value_name: str = "count") -> pd.DataFrame:
+        # The k largest estimates with their error; `guaranteed` marks keys that are certainly
+        # in the true top k (their lower bound beats the (k+1)-th estimate)
+        if self.counts is None:
+            return pd.DataFrame(columns=[value_name, "error", "guaranteed"])
+        order = top_k_indices(self.counts.to_numpy(), min(k + 1, len(self.counts)))
+        counts = self.counts.to_numpy()[order]
+        errors = self.errors.to_numpy()[order]
+        threshold = counts[k] if len(order) > k else 0.0
+        result = pd.DataFrame(
+            {value_name: counts, "error": errors, "guaranteed": counts - errors >= threshold},
+            index=self.counts.index[order],
+        )
+        return result.head(k).reset_index()
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_PRECISION = 12
+
+
+def _canonical(values: pd.Series) -> pd.Series:
+    # Hashes depend on dtype: an id read as int64 in one chunk and as float64 in another (any
+    # chunk with a NaN id) must hash the same, so integral numbers are hashed as int64
+    if pd.api.types.is_bool_dtype(values):
+        return values
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype(np.int64)
+    if pd.api.types.is_float_dtype(values):
+        floats = values.to_numpy(dtype=np.float64)
+        if np.all((floats == np.trunc(floats)) & (np.abs(floats) < 2.0**63)):
+            return pd.Series(floats.astype(np.int64))
+    return values
+
+
+def _hash(values) -> np.ndarray:
+    # Stable 64-bit hashes (same across runs and processes, so sketches can be merged)
+    values = _canonical(pd.Series(values).dropna())
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    # Exact bit length of uint64 values: each 32-bit half converts to float64 without rounding
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+def _register_updates(values, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    # Register index from the top `precision` bits, rank = leading zeros of the rest + 1
+    hashes = _hash(values)
+    rest_bits = 64 - precision
+    index = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    rank = (rest_bits - _bit_length(rest) + 1).astype(np.uint8)
+    return index, rank
+
+
+def _estimate(registers: np.ndarray) -> np.ndarray:
+    # Raw HLL estimate per row of registers, with linear counting for small cardinalities
+    registers = np.atleast_2d(registers)
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=1)
+    zeros = np.sum(registers == 0, axis=1)
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch.
+
+    2**precision one-byte registers (4 KB at the default precision of 12). The relative
+    standard error is 1.04 / sqrt(2**precision), about 1.6% at precision 12, so estimates are
+    within +/-4.9% of the true count with ~99.7% probability. Merging two sketches gives
+    exactly the sketch of the combined input.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values) -> None:
+        index, rank = _register_updates(values, self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        return float(_estimate(self.registers)[0])
+
+
+class GroupedHyperLogLog:
+    """One HyperLogLog per group label (e.g. distinct orders per month), updated in one pass.
+
+    Registers of all groups live in a single (groups x 2**precision) array.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        self.precision = precision
+        self.labels = {}
+        self.registers = np.zeros((0, 1 << precision), dtype=np.uint8)
+
+    def _rows(self, labels) -> np.ndarray:
+        for label in labels:
+            if label not in self.labels:
+                self.labels[label] = len(self.labels)
+        if len(self.labels) > len(self.registers):
+            grown = np.zeros((len(self.labels), self.registers.shape[1]), dtype=np.uint8)
+            grown[: len(self.registers)] = self.registers
+            self.registers = grown
+        return np.array([self.labels[label] for label in labels], dtype=np.intp)
+
+    def update(self, groups: pd.Series, values: pd.Series) -> None:
+        # Rows with a missing group or value are skipped, as groupby().nunique() does
+        valid = groups.notna().to_numpy() & values.notna().to_numpy()
+        group_codes, labels = pd.factorize(groups[valid])
+        rows = self._rows(list(labels))
+        index, rank = _register_updates(values[valid], self.precision)
+        flat = self.registers.reshape(-1)
+        np.maximum.at(flat, rows[group_codes] * self.registers.shape[1] + index, rank)
+
+    def merge(self, other: "GroupedHyperLogLog") -> "GroupedHyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        rows = self._rows(list(other.labels))
+        np.maximum.at(self.registers, rows, other.registers[list(other.labels.values())])
+        return self
+
+    def estimate(self) -> pd.Series:
+        # Estimates per group label, sorted by label like a groupby
+        labels = list(self.labels)
+        estimates = _estimate(self.registers[list(self.labels.values())]) if labels else []
+        return pd.Series(estimates, index=pd.Index(labels), dtype=np.float64).sort_index()
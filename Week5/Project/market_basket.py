@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+PAIR_COLUMNS = ["product_a", "product_b", "count", "support", "confidence_a_to_b", "confidence_b_to_a", "lift"]
+
+
+def basket_matrix(orders: pd.Series, products: pd.Series) -> tuple[sparse.csr_matrix, pd.Index]:
+    # Binary order x product incidence matrix; products are sorted so pair (a, b) has a < b
+    order_codes, _ = pd.factorize(orders)
+    product_codes, product_labels = pd.factorize(products, sort=True)
+    valid = (order_codes >= 0) & (product_codes >= 0)
+    order_codes, product_codes = order_codes[valid], product_codes[valid]
+
+    # Re-number orders so only orders with at least one product count towards support
+    order_codes, order_ids = pd.factorize(order_codes)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(order_codes), dtype=np.int32), (order_codes, product_codes)),
+        shape=(len(order_ids), len(product_labels)),
+    )
+    # Repeated lines of the same product in one order still count once
+    matrix.data[:] = 1
+    return matrix, product_labels
+
+
+def co_purchase_pairs(df: pd.DataFrame, top_k: int | None = None, min_count: int = 1) -> pd.DataFrame:
+    matrix, products = basket_matrix(df["order_id"], df["product"])
+    n_orders = matrix.shape[0]
+    if n_orders == 0:
+        return pd.DataFrame(columns=PAIR_COLUMNS)
+
+    # products x products co-occurrence counts; memory is bounded by the non-zero pairs
+    orders_with = np.asarray(matrix.sum(axis=0)).ravel()
+    co_counts = sparse.triu((matrix.T @ matrix).tocoo(), k=1).tocoo()
+    keep = co_counts.data >= min_count
+    a, b, count = co_counts.row[keep], co_counts.col[keep], co_counts.data[keep].astype(np.int64)
+
+    if top_k is not None and len(count) > top_k:
+        top = np.argpartition(-count, top_k - 1)[:top_k]
+        a, b, count = a[top], b[top], count[top]
+
+    # Most frequent first, ties broken by product names
+    order = np.lexsort((b, a, -count))
+    a, b, count = a[order], b[order], count[order]
+
+    support = count / n_orders
+    support_a = orders_with[a] / n_orders
+    support_b = orders_with[b] / n_orders
+    return pd.DataFrame(
+        {
+            "product_a": products.take(a),
+            "product_b": products.take(b),
+            "count": count,
+            "support": support,
+            "confidence_a_to_b": support / support_a,
+            "confidence_b_to_a": support / support_b,
+            "lift": support / (support_a * support_b),
+        }
+    )
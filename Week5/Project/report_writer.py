@@ -0,0 +1,137 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; without it only JSON Lines are written
+    pa = pq = None
+
+PARQUET_AVAILABLE = pa is not None
+FORMATS = ("parquet", "jsonl")
+ROW_GROUP_SIZE = 100_000
+
+
+def _json_default(value):
+    # numpy scalars, timestamps and the like in KPI values
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    return str(value)
+
+
+def _json_safe(value):
+    # NaN/inf are not JSON; they become null, also inside nested KPI values
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if value is pd.NaT or value is pd.NA:
+        return None
+    return value
+
+
+def flatten_tables(aggs: dict, prefix: str = "") -> tuple[dict, dict]:
+    # Split nested aggregates into {name: DataFrame} and {name: scalar}
+    tables, scalars = {}, {}
+    for name, value in aggs.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            nested_tables, nested_scalars = flatten_tables(value, prefix=f"{key}.")
+            tables.update(nested_tables)
+            scalars.update(nested_scalars)
+        elif isinstance(value, pd.Series):
+            tables[key] = value.reset_index()
+        elif isinstance(value, pd.DataFrame):
+            tables[key] = value
+        else:
+            scalars[key] = value
+    return tables, scalars
+
+
+def to_columnar(frame: pd.DataFrame) -> pd.DataFrame:
+    # Named indexes (pivot rows, cohort months) become columns; column labels become strings
+    if any(name is not None for name in frame.index.names):
+        frame = frame.reset_index()
+    if not all(isinstance(col, str) for col in frame.columns):
+        frame = frame.set_axis([str(col) for col in frame.columns], axis=1)
+    return frame
+
+
+def write_parquet(frame: pd.DataFrame, path: Path, row_group_size: int = ROW_GROUP_SIZE) -> None:
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    tmp = path.with_name(path.name + ".tmp")
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for start in range(0, len(frame), row_group_size):
+            rows = frame.iloc[start : start + row_group_size]
+            writer.write_table(pa.Table.from_pandas(rows, schema=schema, preserve_index=False))
+    os.replace(tmp, path)
+
+
+def write_jsonl(frame: pd.DataFrame, path: Path, row_group_size: int = ROW_GROUP_SIZE) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for start in range(0, len(frame), row_group_size):
+            rows = frame.iloc[start : start + row_group_size]
+            # One JSON object per line, newline-terminated
+            f.write(rows.to_json(orient="records", lines=True, date_format="iso"))
+    os.replace(tmp, path)
+
+
+def write_json(document: dict, path: Path) -> None:
+    # Strict JSON (allow_nan=False) so any reader can parse it
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(_json_safe(document), indent=2, allow_nan=False, default=_json_default))
+    os.replace(tmp, path)
+
+
+def write_report(
+    kpis: dict,
+    aggs: dict,
+    report_dir: str | Path,
+    formats: tuple[str, ...] = FORMATS,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> dict:
+    """Write every aggregate table to Parquet / JSON Lines and the KPIs to kpis.json.
+
+    Tables are written in row groups of `row_group_size`, so nothing is formatted as one big
+    string. Scalar aggregates (e.g. the repeat-purchase rate) go into kpis.json next to the
+    KPIs; missing or non-finite values are written as null. Returns {table name: [written paths]}.
+    """
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown report formats: {sorted(unknown)}")
+    if "parquet" in formats and not PARQUET_AVAILABLE:
+        print("pyarrow is not installed; skipping Parquet output")
+        formats = tuple(fmt for fmt in formats if fmt != "parquet")
+
+    tables, scalars = flatten_tables(aggs)
+    written = {}
+    for name, frame in tables.items():
+        frame = to_columnar(frame)
+        paths = []
+        if "parquet" in formats:
+            paths.append(report_dir / f"{name}.parquet")
+            write_parquet(frame, paths[-1], row_group_size)
+        if "jsonl" in formats:
+            paths.append(report_dir / f"{name}.jsonl")
+            write_jsonl(frame, paths[-1], row_group_size)
+        written[name] = paths
+
+    kpi_path = report_dir / "kpis.json"
+    document = {**kpis, **scalars, "tables": {name: len(frame) for name, frame in tables.items()}}
+    write_json(document, kpi_path)
+    written["kpis"] = [kpi_path]
+    return written
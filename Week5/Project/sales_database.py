@@ -0,0 +1,293 @@
+import argparse
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from market_basket import PAIR_COLUMNS
+
+try:
+    import duckdb
+except ImportError:  # DuckDB is optional; SQLite from the standard library is always available
+    duckdb = None
+
+DUCKDB_SUFFIXES = (".duckdb", ".ddb")
+
+# Columns indexed on the sales table: join key, time filter, product grouping
+SALES_INDEXES = ["customer_id", "order_date", "product"]
+
+# First day of the order month, per engine
+MONTH_EXPR = {
+    "sqlite": "strftime('%Y-%m-01', s.order_date)",
+    "duckdb": "date_trunc('month', s.order_date)",
+}
+
+
+class SalesDatabase:
+    """Customer and sales tables in a local SQLite or DuckDB file.
+
+    The aggregations of customer_sales_analysis are pushed down as SQL, so only the grouped
+    results are loaded into pandas. Results come back in the same shape, order and dtypes as
+    compute_aggregations / compute_kpis on the in-memory frames.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        if self.path.suffix in DUCKDB_SUFFIXES:
+            if duckdb is None:
+                raise ImportError(f"{self.path} is a DuckDB file but the duckdb package is not installed")
+            self.dialect = "duckdb"
+            self.con = duckdb.connect(str(self.path))
+        else:
+            self.dialect = "sqlite"
+            self.con = sqlite3.connect(self.path)
+
+    def close(self) -> None:
+        self.con.close()
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        cursor = self.con.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def has_tables(self) -> bool:
+        if self.dialect == "duckdb":
+            sql = "SELECT table_name FROM information_schema.tables"
+        else:
+            sql = "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+        names = {row[0] for row in self.con.execute(sql).fetchall()}
+        return {"customers", "sales", "prepared"} <= names
+
+    def _append(self, table: str, frame: pd.DataFrame, first: bool) -> None:
+        if self.dialect == "duckdb":
+            self.con.register("chunk", frame)
+            if first:
+                self.con.execute(f"CREATE TABLE {table} AS SELECT * FROM chunk")
+            else:
+                self.con.execute(f"INSERT INTO {table} SELECT * FROM chunk")
+            self.con.unregister("chunk")
+        else:
+            frame.to_sql(table, self.con, if_exists="replace" if first else "append", index=False)
+
+    def import_csv(self, customer_path: str | Path, sales_path: str | Path, chunksize: int = 500_000) -> None:
+        # Parsed with pandas in chunks, so missing values match load_data and the sales file
+        # never has to fit in memory
+        self.con.execute("DROP VIEW IF EXISTS prepared")
+        for table in ("customers", "sales"):
+            self.con.execute(f"DROP TABLE IF EXISTS {table}")
+
+        self._append("customers", pd.read_csv(customer_path), first=True)
+        chunks = pd.read_csv(sales_path, parse_dates=["order_date"], chunksize=chunksize)
+        for i, chunk in enumerate(chunks):
+            self._append("sales", chunk, first=i == 0)
+        self.create_indexes()
+        if self.dialect == "sqlite":
+            self.con.commit()
+
+    def create_indexes(self) -> None:
+        # Unique customer ids give prepare_data's many-to-one join check
+        self.con.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_customer_id ON customers (customer_id)")
+        for col in SALES_INDEXES:
+            self.con.execute(f"CREATE INDEX IF NOT EXISTS idx_sales_{col} ON sales ({col})")
+        # prepare_data as a view: customer attributes joined on, sales region preferred
+        self.con.execute(
+            f"""
+            CREATE VIEW IF NOT EXISTS prepared AS
+            SELECT s.order_id, s.customer_id, s.order_date, s.product, s.quantity, s.unit_price, s.revenue,
+                   c.customer_name, c.segment, COALESCE(s.region, c.region) AS region,
+                   {MONTH_EXPR[self.dialect]} AS order_month
+            FROM sales s LEFT JOIN customers c ON c.customer_id = s.customer_id
+            """
+        )
+
+    def aggregations(self, top_k: int | None = None) -> dict:
+        # Groups come back in key order and are then sorted exactly like the pandas engine
+        top_customers = self.query(
+            """
+            SELECT customer_id, customer_name, COALESCE(SUM(revenue), 0.0) AS revenue
+            FROM prepared
+            WHERE customer_id IS NOT NULL AND customer_name IS NOT NULL
+            GROUP BY customer_id, customer_name
+            ORDER BY customer_id, customer_name
+            """
+        ).sort_values("revenue", ascending=False)
+        if top_k is not None:
+            top_customers = top_customers.head(top_k)
+
+        product_perf = self.query(
+            """
+            SELECT product, COALESCE(SUM(revenue), 0.0) AS total_revenue, COALESCE(SUM(quantity), 0) AS units_sold,
+                   AVG(unit_price) AS avg_price
+            FROM sales
+            WHERE product IS NOT NULL
+            GROUP BY product
+            ORDER BY product
+            """
+        ).sort_values("total_revenue", ascending=False)
+
+        region_summary = self.query(
+            """
+            SELECT region, COALESCE(SUM(revenue), 0.0) AS revenue
+            FROM prepared
+            WHERE region IS NOT NULL
+            GROUP BY region
+            ORDER BY region
+            """
+        ).sort_values("revenue", ascending=False)
+
+        monthly_trend = self.query(
+            """
+            SELECT order_month, COALESCE(SUM(revenue), 0.0) AS monthly_revenue, COUNT(DISTINCT order_id) AS orders
+            FROM prepared
+            WHERE order_month IS NOT NULL
+            GROUP BY order_month
+            ORDER BY order_month
+            """
+        )
+        monthly_trend["order_month"] = pd.to_datetime(monthly_trend["order_month"])
+
+        return {
+            "top_customers": top_customers,
+            "product_perf": product_perf,
+            "region_summary": region_summary,
+            "monthly_trend": monthly_trend,
+            "combo_counts": self.combo_counts(),
+            "pivot_region_product": self.pivot_region_product(),
+        }
+
+    def pivot_region_product(self) -> pd.DataFrame:
+        # region x product sums are grouped in SQL; only the (small) cell table is pivoted here
+        cells = self.query(
+            """
+            SELECT region, product, COALESCE(SUM(revenue), 0.0) AS revenue
+            FROM prepared
+            WHERE region IS NOT NULL AND product IS NOT NULL
+            GROUP BY region, product
+            """
+        )
+        pivot = cells.pivot(index="region", columns="product", values="revenue").fillna(0.0)
+        return pivot.rename_axis(index="region", columns="product")
+
+    def combo_counts(self, top_k: int | None = None) -> pd.DataFrame:
+        # Same statistics as market_basket.co_purchase_pairs, from a self-join of distinct order lines
+        lines = "SELECT DISTINCT order_id, product FROM sales WHERE order_id IS NOT NULL AND product IS NOT NULL"
+        n_orders = self.con.execute(f"SELECT COUNT(DISTINCT order_id) FROM ({lines}) AS lines").fetchone()[0]
+        if n_orders == 0:
+            return pd.DataFrame(columns=PAIR_COLUMNS)
+        limit = "" if top_k is None else f"LIMIT {int(top_k)}"
+        pairs = self.query(
+            f"""
+            WITH lines AS ({lines})
+            SELECT a.product AS product_a, b.product AS product_b, COUNT(*) AS count
+            FROM lines a JOIN lines b ON a.order_id = b.order_id AND a.product < b.product
+            GROUP BY a.product, b.product
+            ORDER BY count DESC, product_a, product_b
+            {limit}
+            """
+        )
+        orders_with = self.query(
+            f"WITH lines AS ({lines}) SELECT product, COUNT(*) AS orders FROM lines GROUP BY product"
+        ).set_index("product")["orders"]
+
+        count = pairs["count"].to_numpy(dtype=np.int64)
+        support = count / n_orders
+        support_a = orders_with.reindex(pairs["product_a"]).to_numpy() / n_orders
+        support_b = orders_with.reindex(pairs["product_b"]).to_numpy() / n_orders
+        return pairs.assign(
+            # Keep pandas' string dtype even when there are no pairs
+            product_a=pairs["product_a"].astype(str),
+            product_b=pairs["product_b"].astype(str),
+            count=count,
+            support=support,
+            confidence_a_to_b=support / support_a,
+            confidence_b_to_a=support / support_b,
+            lift=support / (support_a * support_b),
+        )[PAIR_COLUMNS]
+
+    def kpis(self, aggs: dict | None = None) -> dict:
+        total_revenue, avg_order_value = self.con.execute(
+            "SELECT COALESCE(SUM(revenue), 0.0), AVG(revenue) FROM sales"
+        ).fetchone()
+        total_customers = self.con.execute("SELECT COUNT(DISTINCT customer_id) FROM customers").fetchone()[0]
+        if aggs is None:
+            aggs = {"top_customers": self.aggregations()["top_customers"]}
+        top_customer_row = aggs["top_customers"].head(1).reset_index(drop=True)
+
+        return {
+            "total_revenue": total_revenue,
+            "total_customers": total_customers,
+            "avg_order_value": avg_order_value,
+            "top_customer_name": top_customer_row.at[0, "customer_name"],
+            "top_customer_value": top_customer_row.at[0, "revenue"],
+        }
+
+    def order_lines(self, chunksize: int = 500_000) -> Iterator[pd.DataFrame]:
+        # order_id / product rows sorted by order, in chunks (for frequent_itemsets)
+        cursor = self.con.execute(
+            "SELECT order_id, product FROM sales WHERE order_id IS NOT NULL ORDER BY order_id"
+        )
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield pd.DataFrame(rows, columns=["order_id", "product"])
+
+    def cohort_lines(self, chunksize: int = 500_000) -> Iterator[pd.DataFrame]:
+        # customer_id / order_id / order_date rows in order_date order, in chunks (for cohort_analysis)
+        cursor = self.con.execute("SELECT customer_id, order_id, order_date FROM sales ORDER BY order_date, order_id")
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            chunk = pd.DataFrame(rows, columns=["customer_id", "order_id", "order_date"])
+            chunk["order_id"] = pd.to_numeric(chunk["order_id"])
+            chunk["order_date"] = pd.to_datetime(chunk["order_date"])
+            yield chunk
+
+    def customers(self) -> pd.DataFrame:
+        return self.query("SELECT * FROM customers")
+
+
+def verify_against_pandas(db: SalesDatabase, customers: pd.DataFrame, sales: pd.DataFrame) -> None:
+    # Raises AssertionError if the SQL results differ from the in-memory pandas path
+    from customer_sales_analysis import compute_aggregations, compute_kpis, prepare_data
+
+    merged = prepare_data(customers, sales)
+    expected = compute_aggregations(merged, engine="pandas")
+    actual = db.aggregations()
+    for name, frame in expected.items():
+        pd.testing.assert_frame_equal(actual[name], frame, obj=name)
+
+    expected_kpis = compute_kpis(merged, customers, expected)
+    actual_kpis = db.kpis(actual)
+    for name, value in expected_kpis.items():
+        if isinstance(value, str):
+            assert actual_kpis[name] == value, name
+        else:
+            assert np.isclose(actual_kpis[name], value, rtol=1e-9, equal_nan=True), name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load the customer/sales CSVs into a SQLite or DuckDB file")
+    parser.add_argument("database", help="target file; .duckdb/.ddb uses DuckDB, anything else SQLite")
+    parser.add_argument("--customers", default="customer_data.csv")
+    parser.add_argument("--sales", default="sales_data.csv")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--verify", action="store_true", help="check the SQL results against the pandas path")
+    args = parser.parse_args()
+
+    db = SalesDatabase(args.database)
+    db.import_csv(args.customers, args.sales, chunksize=args.chunksize)
+    print(f"Loaded {args.customers} and {args.sales} into {args.database} ({db.dialect})")
+    if args.verify:
+        customers = pd.read_csv(args.customers)
+        sales = pd.read_csv(args.sales, parse_dates=["order_date"])
+        verify_against_pandas(db, customers, sales)
+        print("SQL aggregations match the pandas path")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+except ImportError:  # pyarrow is optional; without it frames are pickled instead
+    pyarrow = None
+
+PARQUET_AVAILABLE = pyarrow is not None
+
+MANIFEST = "manifest.json"
+
+
+def file_digest(path: str | Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_digest(directory: str | Path) -> str:
+    # Every module of the project (tests aside): editing a callee anywhere changes all keys
+    digest = hashlib.sha256()
+    for path in sorted(Path(directory).glob("*.py")):
+        if path.name.startswith("test_"):
+            continue
+        digest.update(path.name.encode())
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+
+def _code_digest(func: Callable) -> str:
+    # The node function's own code, for functions defined outside the source directory
+    digest = hashlib.sha256()
+    code = getattr(func, "__code__", None)
+    pending = [code] if code is not None else []
+    while pending:
+        code = pending.pop()
+        digest.update(code.co_code)
+        for const in code.co_consts:
+            # Nested code objects (comprehensions, lambdas) repr with their memory address
+            if hasattr(const, "co_code"):
+                pending.append(const)
+            else:
+                digest.update(repr(const).encode())
+    return digest.hexdigest()
+
+
+def _parquet_safe(frame: pd.DataFrame) -> bool:
+    # Parquet round-trips scalar columns; tuples/lists in object columns would come back as arrays
+    if not PARQUET_AVAILABLE:
+        return False
+    for col in frame.columns:
+        if frame[col].dtype == object and pd.api.types.infer_dtype(frame[col]) not in ("string", "empty"):
+            return False
+    return True
+
+
+class ResultCache:
+    """Node results keyed by content hash: an in-memory LRU in front of an on-disk LRU.
+
+    On disk every entry is a directory holding a manifest and either one Parquet file per frame
+    (a DataFrame or a dict of DataFrames) or a pickle for anything else.
+    """
+
+    def __init__(self, directory: str | Path | None = ".cache", max_memory_items: int = 32, max_disk_bytes: int = 1 << 30):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> tuple[bool, object]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return True, self._memory[key]
+        if self.directory is None:
+            return False, None
+        entry = self.directory / key
+        try:
+            value = self._read(entry)
+        except (OSError, ValueError, pickle.UnpicklingError):
+            return False, None
+        os.utime(entry)  # most recently used
+        self._remember(key, value)
+        return True, value
+
+    def put(self, key: str, value: object, persist: bool = True) -> None:
+        self._remember(key, value)
+        if persist and self.directory is not None:
+            self._write(self.directory / key, value)
+            self._evict()
+
+    def _remember(self, key: str, value: object) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _read(self, entry: Path) -> object:
+        manifest = json.loads((entry / MANIFEST).read_text())
+        if manifest["kind"] == "frame":
+            return pd.read_parquet(entry / "0.parquet")
+        if manifest["kind"] == "frames":
+            return {name: pd.read_parquet(entry / f"{i}.parquet") for i, name in enumerate(manifest["names"])}
+        with open(entry / "value.pkl", "rb") as f:
+            return pickle.load(f)
+
+    def _write(self, entry: Path, value: object) -> None:
+        tmp = entry.with_name(f"{entry.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        if isinstance(value, pd.DataFrame) and _parquet_safe(value):
+            value.to_parquet(tmp / "0.parquet")
+            manifest = {"kind": "frame"}
+        elif (
+            isinstance(value, dict)
+            and value
+            and all(isinstance(v, pd.DataFrame) and _parquet_safe(v) for v in value.values())
+        ):
+            for i, frame in enumerate(value.values()):
+                frame.to_parquet(tmp / f"{i}.parquet")
+            manifest = {"kind": "frames", "names": list(value)}
+        else:
+            with open(tmp / "value.pkl", "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            manifest = {"kind": "pickle"}
+        # Manifest last: an entry without one is incomplete and reads as a miss
+        (tmp / MANIFEST).write_text(json.dumps(manifest))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in self.directory.iterdir():
+            if entry.is_dir():
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+@dataclass
+class Node:
+    func: Callable | None
+    deps: tuple[str, ...] = ()
+    params: dict = field(default_factory=dict)
+    persist: bool = True
+    check: Callable[[object], bool] | None = None
+    path: str | None = None
+
+
+class TaskGraph:
+    """Pipeline stages as a dependency graph with memoized results.
+
+    A node's key hashes its function, parameters and the keys of its dependencies; source
+    nodes are keyed by the content hash of their file. Keys are known before anything runs,
+    so a stage whose inputs did not change is read from the cache without touching its
+    dependencies, and a shared intermediate is computed at most once. With `source_dir`,
+    every key also hashes the *.py files there, so editing any project module (not just the
+    node function itself) invalidates the cached results.
+    """
+
+    def __init__(self, cache: ResultCache | None = None, source_dir: str | Path | None = None):
+        self.cache = cache or ResultCache(directory=None)
+        self.sources = source_digest(source_dir) if source_dir is not None else None
+        self.nodes = {}
+        self.computed = []
+        self._keys = {}
+
+    def source(self, name: str, path: str | Path) -> None:
+        self.nodes[name] = Node(func=None, path=str(path))
+
+    def add(
+        self,
+        name: str,
+        func: Callable,
+        deps: list[str] = (),
+        persist: bool = True,
+        check: Callable[[object], bool] | None = None,
+        **params,
+    ) -> None:
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise KeyError(f"{name} depends on unknown nodes: {missing}")
+        self.nodes[name] = Node(func=func, deps=tuple(deps), params=params, persist=persist, check=check)
+
+    def key(self, name: str) -> str:
+        if name not in self._keys:
+            node = self.nodes[name]
+            if node.func is None:
+                self._keys[name] = file_digest(node.path)
+            else:
+                spec = {
+                    "sources": self.sources,
+                    "pandas": pd.__version__,
+                    "func": f"{node.func.__module__}.{node.func.__qualname__}",
+                    "code": _code_digest(node.func),
+                    "params": node.params,
+                    "deps": [self.key(dep) for dep in node.deps],
+                }
+                blob = json.dumps(spec, sort_keys=True, default=str).encode()
+                self._keys[name] = hashlib.sha256(blob).hexdigest()
+        return self._keys[name]
+
+    def get(self, name: str) -> object:
+        node = self.nodes[name]
+        if node.func is None:
+            return node.path
+        key = self.key(name)
+        hit, value = self.cache.get(key)
+        if hit and (node.check is None or node.check(value)):
+            return value
+        args = [self.get(dep) for dep in node.deps]
+        value = node.func(*args, **node.params)
+        self.cache.put(key, value, persist=node.persist)
+        self.computed.append(name)
+        return value
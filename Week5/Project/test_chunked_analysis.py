@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cohort_retention import cohort_analysis
+from customer_sales_analysis import analyze_chunked, compute_aggregations, compute_kpis, prepare_data
+from hyperloglog import HyperLogLog
+
+# HyperLogLog estimates must land within this many standard errors of the exact counts
+ERROR_BOUND = 4 * HyperLogLog().relative_error
+
+
+@pytest.fixture(scope="module")
+def frames():
+    rng = np.random.default_rng(7)
+    n_customers, n_lines = 3000, 20000
+    customers = pd.DataFrame({
+        "customer_id": [f"C{i:05d}" for i in range(n_customers)],
+        "customer_name": [f"Customer {i}" for i in range(n_customers)],
+        "segment": rng.choice(["Retail", "Wholesale", None], n_customers),
+        "region": rng.choice(["North", "South", "East", "West", None], n_customers),
+        "signup_date": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 700, n_customers), unit="D"),
+    })
+    order_ids = np.sort(rng.integers(0, n_lines // 2, n_lines))
+    order_customer = rng.integers(0, n_customers + 50, n_lines // 2)  # some unknown customers
+    quantity = rng.integers(-1, 10, n_lines)
+    unit_price = rng.choice([2.5, 5.0, 105.0, np.nan], n_lines)
+    sales = pd.DataFrame({
+        "order_id": order_ids + 1000,
+        "customer_id": [f"C{i:05d}" for i in order_customer[order_ids]],
+        "order_date": pd.Timestamp("2023-01-01") + pd.to_timedelta(order_ids // 20, unit="D"),
+        "region": rng.choice(["North", "South", "East", "West", None], n_lines),
+        "product": rng.choice(["Resistor Pack", "Capacitor Kit", "Sensor Bundle", "LED Strip"], n_lines),
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "revenue": quantity * unit_price,
+    })
+    return customers, sales
+
+
+@pytest.fixture(scope="module")
+def chunked(frames):
+    customers, sales = frames
+    return analyze_chunked(customers, (sales.iloc[i:i + 3000] for i in range(0, len(sales), 3000)))
+
+
+@pytest.mark.parametrize("name", ["top_customers", "product_perf", "region_summary", "combo_counts", "pivot_region_product"])
+def test_sums_match_pandas(frames, chunked, name):
+    expected = compute_aggregations(prepare_data(*frames), engine="pandas")[name]
+    actual = chunked[0][name]
+    if isinstance(expected.index, pd.RangeIndex):
+        expected, actual = expected.reset_index(drop=True), actual.reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_monthly_orders_within_error_bound(frames, chunked):
+    expected = compute_aggregations(prepare_data(*frames), engine="pandas")["monthly_trend"].reset_index(drop=True)
+    actual = chunked[0]["monthly_trend"].reset_index(drop=True)
+    pd.testing.assert_series_equal(actual["monthly_revenue"], expected["monthly_revenue"])
+    np.testing.assert_allclose(actual["orders"], expected["orders"], rtol=ERROR_BOUND)
+
+
+def test_kpis_within_error_bound(frames, chunked):
+    customers, sales = frames
+    merged = prepare_data(customers, sales)
+    expected = compute_kpis(merged, customers, compute_aggregations(merged, engine="pandas"))
+    actual = chunked[1]
+    assert actual.keys() == expected.keys()
+    assert actual["total_customers"] == pytest.approx(expected["total_customers"], rel=ERROR_BOUND)
+    assert actual["total_revenue"] == pytest.approx(expected["total_revenue"])
+    assert actual["avg_order_value"] == pytest.approx(expected["avg_order_value"])
+    assert actual["top_customer_name"] == expected["top_customer_name"]
+
+
+def test_cohorts_match_pandas(frames, chunked):
+    expected = cohort_analysis(*frames)
+    actual = chunked[0]["cohorts"]
+    for name, value in expected.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(actual[name], value, obj=name)
+        elif isinstance(value, pd.Series):
+            pd.testing.assert_series_equal(actual[name], value, obj=name)
+        else:
+            assert actual[name] == pytest.approx(value), name
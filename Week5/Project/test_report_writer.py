@@ -0,0 +1,24 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from report_writer import write_report
+
+
+def reject_constant(name):
+    raise AssertionError(f"kpis.json contains {name}, which is not JSON")
+
+
+def test_kpis_json_is_strict(tmp_path):
+    kpis = {"avg_order_value": np.float64("nan"), "total_revenue": float("inf"), "total_customers": np.int64(3)}
+    aggs = {"cohorts": {"repeat_rate": np.nan, "retention": pd.DataFrame({"month": [0], "customers": [3]})}}
+    write_report(kpis, aggs, tmp_path, formats=("jsonl",))
+
+    text = (tmp_path / "kpis.json").read_text()
+    document = json.loads(text, parse_constant=reject_constant)
+    assert document["avg_order_value"] is None
+    assert document["total_revenue"] is None
+    assert document["total_customers"] == 3
+    assert document["cohorts.repeat_rate"] is None
+    assert not list(tmp_path.glob("*.tmp"))
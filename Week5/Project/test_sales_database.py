@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cohort_retention import cohort_analysis
+from customer_sales_analysis import compute_aggregations, compute_kpis, prepare_data
+from sales_database import SalesDatabase, duckdb, verify_against_pandas
+
+CUSTOMERS_CSV = """customer_id,customer_name,segment,region,signup_date
+C001,John Smith,Retail,North,2022-11-15
+C002,Sophia Lee,Wholesale,West,2021-07-04
+C003,,Retail,South,
+C004,Ava Brown,,,2023-02-01
+C005,Liam Chen,Retail,East,2023-03-10
+"""
+
+# Duplicate lines, missing keys and values, negative quantities (returns) and unknown customers
+SALES_CSV = """order_id,customer_id,order_date,region,product,quantity,unit_price,revenue
+1001,C001,2024-01-05,North,Resistor Pack,10,2.50,25.0
+1001,C001,2024-01-05,North,Capacitor Kit,2,5.00,10.0
+1001,C001,2024-01-05,North,Capacitor Kit,2,5.00,10.0
+1002,C002,2024-01-06,,Capacitor Kit,5,5.00,25.0
+1002,C002,2024-01-06,,Sensor Bundle,1,105.00,105.0
+1003,C003,2024-02-10,South,Resistor Pack,-4,2.50,-10.0
+1004,C004,2024-02-11,,Sensor Bundle,2,105.00,
+1005,C999,2024-02-12,East,Resistor Pack,3,2.50,7.5
+1006,,2024-03-01,West,Capacitor Kit,1,5.00,5.0
+1007,C005,,East,Resistor Pack,1,2.50,2.5
+1008,C005,2024-03-15,East,,2,,
+1009,C001,2024-03-20,North,Sensor Bundle,-1,105.00,-105.0
+1009,C001,2024-03-20,North,Resistor Pack,6,2.50,15.0
+1010,C002,2024-03-21,West,Resistor Pack,4,2.50,10.0
+1010,C002,2024-03-21,West,Capacitor Kit,3,5.00,15.0
+"""
+
+SUFFIXES = [".db", pytest.param(".duckdb", marks=pytest.mark.skipif(duckdb is None, reason="duckdb not installed"))]
+
+
+@pytest.fixture
+def csv_paths(tmp_path):
+    customer_path = tmp_path / "customers.csv"
+    sales_path = tmp_path / "sales.csv"
+    customer_path.write_text(CUSTOMERS_CSV)
+    sales_path.write_text(SALES_CSV)
+    return customer_path, sales_path
+
+
+@pytest.fixture(params=SUFFIXES)
+def db(request, tmp_path, csv_paths):
+    database = SalesDatabase(tmp_path / f"sales{request.param}")
+    database.import_csv(*csv_paths, chunksize=4)  # several chunks
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def frames(csv_paths):
+    customer_path, sales_path = csv_paths
+    customers = pd.read_csv(customer_path)
+    sales = pd.read_csv(sales_path, parse_dates=["order_date"])
+    return customers, sales
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["top_customers", "product_perf", "region_summary", "monthly_trend", "combo_counts", "pivot_region_product"],
+)
+def test_aggregation_matches_pandas(db, frames, name):
+    expected = compute_aggregations(prepare_data(*frames), engine="pandas")[name]
+    pd.testing.assert_frame_equal(db.aggregations()[name], expected)
+
+
+@pytest.mark.parametrize("top_k", [1, 3])
+def test_top_k_matches_pandas(db, frames, top_k):
+    expected = compute_aggregations(prepare_data(*frames), engine="pandas", top_k=top_k)
+    actual = db.aggregations(top_k=top_k)
+    pd.testing.assert_frame_equal(actual["top_customers"], expected["top_customers"])
+
+
+def test_kpis_match_pandas(db, frames):
+    customers, sales = frames
+    merged = prepare_data(customers, sales)
+    expected = compute_kpis(merged, customers, compute_aggregations(merged, engine="pandas"))
+    actual = db.kpis()
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        if isinstance(value, str):
+            assert actual[name] == value, name
+        else:
+            assert np.isclose(actual[name], value, rtol=1e-9, equal_nan=True), name
+
+
+def test_cohorts_match_pandas(db, frames):
+    expected = cohort_analysis(*frames)
+    actual = cohort_analysis(db.customers(), db.cohort_lines(chunksize=4))
+    for name, value in expected.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(actual[name], value, obj=name)
+        elif isinstance(value, pd.Series):
+            pd.testing.assert_series_equal(actual[name], value, obj=name)
+        else:
+            assert actual[name] == pytest.approx(value), name
+
+
+def test_verify_against_pandas(db, frames):
+    verify_against_pandas(db, *frames)
+
+
+def test_duplicate_customer_ids_are_rejected(tmp_path, csv_paths):
+    customer_path, sales_path = csv_paths
+    customer_path.write_text(CUSTOMERS_CSV + "C001,John Smith,Retail,North,2022-11-15\n")
+    with pytest.raises(pd.errors.MergeError):
+        prepare_data(pd.read_csv(customer_path), pd.read_csv(sales_path, parse_dates=["order_date"]))
+    database = SalesDatabase(tmp_path / "dupes.db")
+    with pytest.raises(Exception, match="UNIQUE"):
+        database.import_csv(customer_path, sales_path)
+    database.close()
@@ -18,6 +18,9 @@ from visualizations.charts import (
     create_product_region_heatmap,
     COLOR_SCHEME
 )
+from visualizations.chart_data import ChartDataCache, filter_key, prepare_chart_data
+from filter_index import FilterIndex
+from rollup import build_rollup, rollup_kpis
 import matplotlib.pyplot as plt
 
 # Page configuration
@@ -54,15 +57,21 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-@st.cache_data
+@st.cache_resource
 def load_data():
-    """Load and cache the sales data"""
+    """Load the sales data and build its filter index and daily rollup (once, shared across reruns)"""
     df = pd.read_csv('sales_data.csv')
     df['Date'] = pd.to_datetime(df['Date'])
-    return df
+    return FilterIndex(df), FilterIndex(build_rollup(df))
+
+@st.cache_resource
+def chart_data_cache():
+    """Chart aggregates per filter state, shared by all sessions"""
+    return ChartDataCache(max_entries=64)
 
 # Load data
-df = load_data()
+index, rollup_index = load_data()
+df = index.df
 
 # Header
 st.markdown('<h1 class="main-header">📊 Interactive Sales Dashboard</h1>', unsafe_allow_html=True)
@@ -73,32 +82,36 @@ st.sidebar.header("🔍 Filters")
 # Date filter
 date_range = st.sidebar.date_input(
     "Select Date Range",
-    value=(df['Date'].min(), df['Date'].max()),
-    min_value=df['Date'].min(),
-    max_value=df['Date'].max()
+    value=(index.min_date, index.max_date),
+    min_value=index.min_date,
+    max_value=index.max_date
 )
 
 # Product filter
 products = st.sidebar.multiselect(
     "Select Products",
-    options=sorted(df['Product'].unique()),
-    default=sorted(df['Product'].unique())
+    options=index.options('Product'),
+    default=index.options('Product')
 )
 
 # Region filter
 regions = st.sidebar.multiselect(
     "Select Regions",
-    options=sorted(df['Region'].unique()),
-    default=sorted(df['Region'].unique())
+    options=index.options('Region'),
+    default=index.options('Region')
 )
 
-# Apply filters
-filtered_df = df[
-    (df['Date'].dt.date >= pd.to_datetime(date_range[0]).date()) &
-    (df['Date'].dt.date <= pd.to_datetime(date_range[1]).date()) &
-    (df['Product'].isin(products)) &
-    (df['Region'].isin(regions))
-]
+# Apply filters (a date range may have only its start picked so far)
+# Raw rows are only read by the per-order charts, unique customers and the raw data table
+filtered_df = index.filter(date_range[0], date_range[-1], products, regions)
+filtered_rollup = rollup_index.filter(date_range[0], date_range[-1], products, regions)
+kpis = rollup_kpis(filtered_rollup)
+
+# Aggregates for the Plotly charts, computed once per filter state
+chart_data = chart_data_cache().get(
+    filter_key((date_range[0], date_range[-1]), products, regions),
+    lambda: prepare_chart_data(filtered_rollup)
+)
 
 # Key Metrics
 st.header("📈 Key Performance Indicators")
@@ -106,15 +119,15 @@ st.header("📈 Key Performance Indicators")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_sales = filtered_df['Total_Sales'].sum()
+    total_sales = kpis['total_sales']
     st.metric("Total Sales", f"${total_sales:,.0f}")
 
 with col2:
-    avg_order_value = filtered_df['Total_Sales'].mean()
+    avg_order_value = kpis['avg_order_value']
     st.metric("Average Order Value", f"${avg_order_value:,.2f}")
 
 with col3:
-    total_orders = len(filtered_df)
+    total_orders = kpis['total_orders']
     st.metric("Total Orders", f"{total_orders:,}")
 
 with col4:
@@ -151,13 +164,13 @@ chart_options = st.sidebar.multiselect(
 # Main dashboard area
 if "Sales Trend Over Time" in chart_options:
     st.header("📈 Sales Trend Over Time")
-    fig = create_sales_trend_line(filtered_df)
+    fig = create_sales_trend_line(chart_data)
     st.plotly_chart(fig, use_container_width=True)
     st.divider()
 
 if "Cumulative Sales" in chart_options:
     st.header("📈 Cumulative Sales Over Time")
-    fig = create_cumulative_sales_area(filtered_df)
+    fig = create_cumulative_sales_area(chart_data)
     st.plotly_chart(fig, use_container_width=True)
     st.divider()
 
@@ -167,13 +180,13 @@ col1, col2 = st.columns(2)
 with col1:
     if "Sales by Product" in chart_options:
         st.header("📊 Sales by Product")
-        fig = create_product_sales_bar(filtered_df)
+        fig = create_product_sales_bar(chart_data)
         st.plotly_chart(fig, use_container_width=True)
 
 with col2:
     if "Sales by Region" in chart_options:
         st.header("🌍 Sales by Region")
-        fig = create_region_sales_pie(filtered_df)
+        fig = create_region_sales_pie(chart_data)
         st.plotly_chart(fig, use_container_width=True)
 
 if "Sales by Product" in chart_options or "Sales by Region" in chart_options:
@@ -181,7 +194,7 @@ if "Sales by Product" in chart_options or "Sales by Region" in chart_options:
 
 if "Monthly Sales Comparison" in chart_options:
     st.header("📅 Monthly Sales Comparison")
-    fig = create_monthly_sales_comparison(filtered_df)
+    fig = create_monthly_sales_comparison(chart_data)
     st.plotly_chart(fig, use_container_width=True)
     st.divider()
 
@@ -213,7 +226,7 @@ if "Price Distribution (Box Plot)" in chart_options or "Price Distribution (Viol
 
 if "Product vs Region Heatmap" in chart_options:
     st.header("🔥 Sales Heatmap: Product vs Region")
-    fig = create_product_region_heatmap(filtered_df)
+    fig = create_product_region_heatmap(chart_data)
     st.plotly_chart(fig, use_container_width=True)
     st.divider()
 
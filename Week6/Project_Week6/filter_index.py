@@ -0,0 +1,102 @@
+"""
+Filter index for the dashboard's date / product / region filters.
+
+Rows are sorted by Date once, so a date range is a searchsorted slice, and every Product and
+Region value keeps the sorted positions of its rows. A filter then costs time proportional
+to the rows it selects instead of a scan over the whole dataset.
+"""
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """
+    Sales rows sorted by Date plus row-position lists per Product / Region value
+    """
+
+    def __init__(self, df, date_col='Date', columns=('Product', 'Region')):
+        self.df = df.sort_values(date_col, kind='stable').reset_index(drop=True)
+        self.date_col = date_col
+        self.dates = self.df[date_col].to_numpy()
+        self.codes = {}
+        self.labels = {}
+        self.positions = {}
+        for col in columns:
+            codes, labels = pd.factorize(self.df[col], sort=True)
+            # Stable sort keeps each value's positions in date order
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            self.codes[col] = codes
+            self.labels[col] = list(labels)
+            self.positions[col] = {
+                label: order[bounds[i]:bounds[i + 1]] for i, label in enumerate(labels)
+            }
+
+    @property
+    def min_date(self):
+        return self.df[self.date_col].iloc[0] if len(self.df) else pd.NaT
+
+    @property
+    def max_date(self):
+        return self.df[self.date_col].iloc[-1] if len(self.df) else pd.NaT
+
+    def options(self, col):
+        """
+        Sorted distinct values of an indexed column (for the sidebar widgets)
+        """
+        return self.labels[col]
+
+    def date_slice(self, start, end):
+        """
+        Row positions [lo, hi) for dates from `start` to `end`, both days inclusive
+        """
+        start = np.datetime64(pd.Timestamp(start).normalize())
+        end = np.datetime64(pd.Timestamp(end).normalize() + pd.Timedelta(days=1))
+        lo = np.searchsorted(self.dates, start, side='left')
+        hi = np.searchsorted(self.dates, end, side='left')
+        return lo, hi
+
+    def rows(self, start, end, selections):
+        """
+        Sorted row positions inside the date range whose indexed columns take one of the
+        selected values; `selections` maps column -> selected values
+        """
+        lo, hi = self.date_slice(start, end)
+        restricted = {
+            col: set(values) for col, values in selections.items()
+            if set(self.labels[col]) - set(values)
+        }
+        if not restricted:
+            return np.arange(lo, hi)
+
+        # Candidates from the most selective column, each value's list clipped to [lo, hi)
+        def candidate_count(col):
+            return sum(
+                np.searchsorted(pos, hi) - np.searchsorted(pos, lo)
+                for value, pos in self.positions[col].items() if value in restricted[col]
+            )
+
+        first = min(restricted, key=candidate_count)
+        parts = []
+        for value in restricted[first]:
+            pos = self.positions[first].get(value)
+            if pos is not None:
+                parts.append(pos[np.searchsorted(pos, lo):np.searchsorted(pos, hi)])
+        rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+        # Remaining columns are checked on the candidates only, through a code lookup table
+        for col, values in restricted.items():
+            if col == first:
+                continue
+            allowed = np.array([label in values for label in self.labels[col]] + [False])
+            rows = rows[allowed[self.codes[col][rows]]]
+        return rows
+
+    def filter(self, start, end, products, regions):
+        """
+        The dashboard's filtered_df: rows in the date range for the selected products and regions
+        """
+        rows = self.rows(start, end, {'Product': products, 'Region': regions})
+        if len(rows) == len(self.df):
+            return self.df
+        return self.df.take(rows)
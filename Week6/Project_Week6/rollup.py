@@ -0,0 +1,51 @@
+"""
+Daily Date x Product x Region rollup of the sales rows.
+
+Everything additive the dashboard shows (KPIs, trend lines, product / region totals, the
+product x region heatmap) is answered from the rollup, which stays a few hundred thousand rows
+however many orders there are. Raw rows are only needed for per-order views.
+"""
+import numpy as np
+import pandas as pd
+
+KEYS = ['Date', 'Product', 'Region']
+
+
+def build_rollup(df):
+    """
+    Sales, quantity, order count and price sum / sum of squares per day, product and region
+    """
+    price = df['Price'].astype(float)
+    grouped = df.assign(
+        Date=pd.to_datetime(df['Date']).dt.normalize(),
+        Price_Sq=price * price
+    ).groupby(KEYS, sort=True)
+    return grouped.agg(
+        Total_Sales=('Total_Sales', 'sum'),
+        Quantity=('Quantity', 'sum'),
+        Orders=('Total_Sales', 'size'),
+        Price_Sum=('Price', 'sum'),
+        Price_Sq_Sum=('Price_Sq', 'sum')
+    ).reset_index()
+
+
+def rollup_kpis(rollup):
+    """
+    Order-level KPIs of the rows behind a (filtered) rollup
+    """
+    orders = int(rollup['Orders'].sum())
+    total_sales = rollup['Total_Sales'].sum()
+    if not orders:
+        return {'total_sales': total_sales, 'total_orders': 0, 'total_quantity': 0,
+                'avg_order_value': np.nan, 'avg_price': np.nan, 'price_std': np.nan}
+    avg_price = rollup['Price_Sum'].sum() / orders
+    # Sample standard deviation from the sums, like Series.std()
+    variance = (rollup['Price_Sq_Sum'].sum() - orders * avg_price ** 2) / (orders - 1) if orders > 1 else np.nan
+    return {
+        'total_sales': total_sales,
+        'total_orders': orders,
+        'total_quantity': rollup['Quantity'].sum(),
+        'avg_order_value': total_sales / orders,
+        'avg_price': avg_price,
+        'price_std': np.sqrt(max(variance, 0)) if orders > 1 else np.nan,
+    }
@@ -7,6 +7,7 @@ from .charts import (
     create_region_sales_pie,
     create_price_distribution_box,
     create_quantity_sales_scatter,
+    create_quantity_sales_density,
     create_correlation_heatmap,
     create_cumulative_sales_area,
     create_price_distribution_violin,
@@ -14,6 +15,8 @@ from .charts import (
     create_product_region_heatmap,
     COLOR_SCHEME
 )
+from .chart_data import prepare_chart_data, filter_key, ChartDataCache
+from .downsample import lttb_indices, downsample
 
 __all__ = [
     'create_sales_trend_line',
@@ -21,10 +24,16 @@ __all__ = [
     'create_region_sales_pie',
     'create_price_distribution_box',
     'create_quantity_sales_scatter',
+    'create_quantity_sales_density',
     'create_correlation_heatmap',
     'create_cumulative_sales_area',
     'create_price_distribution_violin',
     'create_monthly_sales_comparison',
     'create_product_region_heatmap',
-    'COLOR_SCHEME'
+    'COLOR_SCHEME',
+    'prepare_chart_data',
+    'filter_key',
+    'ChartDataCache',
+    'lttb_indices',
+    'downsample'
 ]
@@ -0,0 +1,80 @@
+"""
+Aggregates behind the Plotly charts, computed once per filter state and shared by all charts
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def filter_key(date_range, products, regions):
+    """
+    Hash of a filter state; selection order does not matter
+    """
+    state = {
+        'dates': [pd.Timestamp(d).date().isoformat() for d in date_range],
+        'products': sorted(map(str, products)),
+        'regions': sorted(map(str, regions)),
+    }
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
+
+def prepare_chart_data(df):
+    """
+    Daily, monthly, product, region and product x region sales of the (filtered) rows
+    """
+    dates = pd.to_datetime(df['Date'])
+    daily = df['Total_Sales'].groupby(dates).sum().rename_axis('Date').reset_index()
+
+    month = daily['Date'].dt.strftime('%Y-%m').rename('Month')
+    monthly = daily['Total_Sales'].groupby(month).sum().reset_index()
+
+    # One pass over the rows for both dimensions; the totals per dimension come from it
+    product_region = df.groupby(['Product', 'Region'])['Total_Sales'].sum()
+    product = product_region.groupby(level='Product').sum().reset_index()
+    region = product_region.groupby(level='Region').sum().reset_index()
+
+    return {
+        'daily': daily,
+        'monthly': monthly,
+        'product': product,
+        'region': region,
+        'product_region': product_region.unstack('Region').fillna(0),
+    }
+
+
+def chart_data(data):
+    """
+    Chart aggregates from prepare_chart_data, or computed here when given raw rows
+    """
+    return data if isinstance(data, dict) else prepare_chart_data(data)
+
+
+class ChartDataCache:
+    """
+    Bounded LRU of chart aggregates keyed by filter_key, safe to share between sessions
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Cached aggregates for `key`, calling compute() on a miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        # Computed outside the lock so other sessions are not blocked meanwhile
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
@@ -1,7 +1,6 @@
 """
 Chart creation functions using Seaborn for statistical plots and Plotly for interactive charts
 """
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -9,6 +8,9 @@ from plotly.subplots import make_subplots
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from .chart_data import chart_data
+from .downsample import downsample, TIME_SERIES_MAX_POINTS
+
 # Cohesive color scheme
 COLOR_SCHEME = {
     'primary': '#6366f1',      # Indigo
@@ -20,28 +22,32 @@ COLOR_SCHEME = {
     'palette': ['#6366f1', '#8b5cf6', '#ec4899', '#10b981', '#f59e0b', '#06b6d4']
 }
 
+# Above this many rows the quantity / sales scatter is drawn as per-product 2D histograms
+SCATTER_MAX_POINTS = 50_000
+SCATTER_BINS = 40
+
 # Set Seaborn style
 sns.set_style("whitegrid")
 sns.set_palette(COLOR_SCHEME['palette'])
 
 
-def create_sales_trend_line(df):
+def create_sales_trend_line(data, max_points=TIME_SERIES_MAX_POINTS):
     """
     Create an interactive line chart showing sales trends over time (Plotly)
+    Series longer than max_points are LTTB-downsampled; the kept points carry their exact values
     """
-    df_copy = df.copy()
-    df_copy['Date'] = pd.to_datetime(df_copy['Date'])
-    daily_sales = df_copy.groupby('Date')['Total_Sales'].sum().reset_index()
-    daily_sales = daily_sales.sort_values('Date')
+    daily_sales = chart_data(data)['daily']
+    shown = downsample(daily_sales, 'Date', 'Total_Sales', max_points)
+    full_resolution = len(shown) == len(daily_sales)
     
     fig = px.line(
-        daily_sales,
+        shown,
         x='Date',
         y='Total_Sales',
         title='📈 Sales Trend Over Time',
         labels={'Total_Sales': 'Total Sales ($)', 'Date': 'Date'},
-        markers=True,
-        line_shape='spline',
+        markers=full_resolution,
+        line_shape='spline' if full_resolution else 'linear',
         color_discrete_sequence=[COLOR_SCHEME['primary']]
     )
     fig.update_layout(
@@ -55,11 +61,11 @@ def create_sales_trend_line(df):
     return fig
 
 
-def create_product_sales_bar(df):
+def create_product_sales_bar(data):
     """
     Create an interactive bar chart showing sales by product (Plotly)
     """
-    product_sales = df.groupby('Product')['Total_Sales'].sum().reset_index()
+    product_sales = chart_data(data)['product']
     product_sales = product_sales.sort_values('Total_Sales', ascending=True)
     
     fig = px.bar(
@@ -83,11 +89,11 @@ def create_product_sales_bar(df):
     return fig
 
 
-def create_region_sales_pie(df):
+def create_region_sales_pie(data):
     """
     Create an interactive pie chart showing sales distribution by region (Plotly)
     """
-    region_sales = df.groupby('Region')['Total_Sales'].sum().reset_index()
+    region_sales = chart_data(data)['region']
     
     fig = px.pie(
         region_sales,
@@ -129,10 +135,77 @@ def create_price_distribution_box(df):
     return ax.get_figure()
 
 
-def create_quantity_sales_scatter(df):
+def _bin_edges(values, bins):
+    """
+    Histogram bin edges; integer columns with a small range get one bin per value
+    """
+    lo, hi = float(values.min()), float(values.max())
+    if np.issubdtype(values.dtype, np.integer) and hi - lo + 1 <= bins:
+        return np.arange(lo - 0.5, hi + 1.5)
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+def create_quantity_sales_density(df, bins=SCATTER_BINS):
+    """
+    Create per-product 2D histograms of quantity vs sales, binned on the server (Plotly)
+    """
+    df = df.dropna(subset=['Quantity', 'Total_Sales'])
+    products = sorted(df['Product'].dropna().unique())
+    cols = min(len(products), 3) or 1
+    rows = -(-len(products) // cols) or 1
+    fig = make_subplots(
+        rows=rows,
+        cols=cols,
+        subplot_titles=[str(p) for p in products],
+        shared_xaxes=True,
+        shared_yaxes=True
+    )
+    if not products:
+        return fig
+    x_edges = _bin_edges(df['Quantity'].to_numpy(), bins)
+    y_edges = _bin_edges(df['Total_Sales'].to_numpy(), bins)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+    for i, (product, group) in enumerate(df.groupby('Product', sort=True)):
+        counts, _, _ = np.histogram2d(
+            group['Quantity'].to_numpy(), group['Total_Sales'].to_numpy(), bins=[x_edges, y_edges]
+        )
+        color = COLOR_SCHEME['palette'][i % len(COLOR_SCHEME['palette'])]
+        fig.add_trace(
+            go.Heatmap(
+                x=x_centers,
+                y=y_centers,
+                z=np.where(counts > 0, counts, np.nan).T,  # empty bins stay transparent
+                colorscale=[[0, '#f5f5ff'], [1, color]],
+                showscale=False,
+                name=str(product),
+                hovertemplate='Quantity: %{x}<br>Total Sales: $%{y:,.0f}<br>Orders: %{z:,}<extra>' + str(product) + '</extra>'
+            ),
+            row=i // cols + 1,
+            col=i % cols + 1
+        )
+    fig.update_xaxes(title_text='Quantity', row=rows)
+    fig.update_yaxes(title_text='Total Sales ($)', col=1)
+    fig.update_layout(
+        title='🎯 Quantity vs Total Sales by Product (order density)',
+        template='plotly_white',
+        height=max(400, 300 * rows),
+        plot_bgcolor='white'
+    )
+    return fig
+
+
+def create_quantity_sales_scatter(df, max_points=SCATTER_MAX_POINTS, bins=SCATTER_BINS):
     """
     Create an interactive scatter plot showing relationship between quantity and sales (Plotly)
+    WebGL markers up to max_points rows, per-product density heatmaps above that
     """
+    if len(df) > max_points:
+        return create_quantity_sales_density(df, bins=bins)
+
     fig = px.scatter(
         df,
         x='Quantity',
@@ -146,7 +219,8 @@ def create_quantity_sales_scatter(df):
             'Price': 'Price ($)'
         },
         hover_data=['Region', 'Customer_ID'],
-        color_discrete_sequence=COLOR_SCHEME['palette']
+        color_discrete_sequence=COLOR_SCHEME['palette'],
+        render_mode='webgl'
     )
     fig.update_layout(
         xaxis_title='Quantity',
@@ -181,15 +255,14 @@ def create_correlation_heatmap(df):
     return ax.get_figure()
 
 
-def create_cumulative_sales_area(df):
+def create_cumulative_sales_area(data, max_points=TIME_SERIES_MAX_POINTS):
     """
     Create an interactive area chart showing cumulative sales over time (Plotly)
+    The running total is taken over every day before LTTB-downsampling to max_points
     """
-    df_copy = df.copy()
-    df_copy['Date'] = pd.to_datetime(df_copy['Date'])
-    daily_sales = df_copy.groupby('Date')['Total_Sales'].sum().reset_index()
-    daily_sales = daily_sales.sort_values('Date')
-    daily_sales['Cumulative_Sales'] = daily_sales['Total_Sales'].cumsum()
+    daily_sales = chart_data(data)['daily']
+    daily_sales = daily_sales.assign(Cumulative_Sales=daily_sales['Total_Sales'].cumsum())
+    daily_sales = downsample(daily_sales, 'Date', 'Cumulative_Sales', max_points)
     
     fig = px.area(
         daily_sales,
@@ -230,16 +303,11 @@ def create_price_distribution_violin(df):
     return ax.get_figure()
 
 
-def create_monthly_sales_comparison(df):
+def create_monthly_sales_comparison(data):
     """
     Create a bar chart comparing monthly sales (Plotly)
     """
-    df_copy = df.copy()
-    df_copy['Date'] = pd.to_datetime(df_copy['Date'])
-    df_copy['Month'] = df_copy['Date'].dt.strftime('%Y-%m')
-    
-    monthly_sales = df_copy.groupby('Month')['Total_Sales'].sum().reset_index()
-    monthly_sales = monthly_sales.sort_values('Month')
+    monthly_sales = chart_data(data)['monthly']
     
     fig = px.bar(
         monthly_sales,
@@ -261,16 +329,11 @@ def create_monthly_sales_comparison(df):
     return fig
 
 
-def create_product_region_heatmap(df):
+def create_product_region_heatmap(data):
     """
     Create a heatmap showing sales by product and region (Plotly)
     """
-    pivot_data = df.pivot_table(
-        values='Total_Sales',
-        index='Product',
-        columns='Region',
-        aggfunc='sum'
-    ).fillna(0)
+    pivot_data = chart_data(data)['product_region']
     
     fig = px.imshow(
         pivot_data,
@@ -0,0 +1,45 @@
+"""
+Largest-Triangle-Three-Buckets downsampling for the time-series charts
+"""
+import numpy as np
+
+# About one point per horizontal pixel of a full-width chart
+TIME_SERIES_MAX_POINTS = 1200
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Positions of the n_out points LTTB keeps from the series (x ascending); first and last are always kept
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Points 1 .. n-2 split into n_out-2 buckets; one point is picked per bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Pick the point forming the largest triangle with the last pick and the next bucket's mean
+        cx, cy = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(df, x, y, max_points=TIME_SERIES_MAX_POINTS):
+    """
+    Rows of df kept by LTTB on columns x / y; df itself when it already fits in max_points
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+    x_values = df[x].to_numpy()
+    if np.issubdtype(x_values.dtype, np.datetime64):
+        x_values = x_values.astype('datetime64[ns]').astype(np.int64)
+    return df.iloc[lttb_indices(x_values, df[y].to_numpy(), max_points)]